@@ -1,6 +1,8 @@
 """Defines agent classes."""
 
-from functools import cached_property
+import math
+from dataclasses import replace
+from functools import cached_property, lru_cache
 from typing import TYPE_CHECKING, Any, Callable, Dict, List, Self, Tuple
 
 import mujoco as mj
@@ -24,6 +26,93 @@ if TYPE_CHECKING:
     from cambrian.envs import MjCambrianEnv
 
 
+def _parse_actuators(
+    spec: MjCambrianSpec, body_name: str
+) -> Tuple[List[MjCambrianActuator], List[MjCambrianJoint]]:
+    """Parses the actuators and joints whose root body is `body_name`.
+
+    Mujoco doesn't have a neat way to grab the actuators associated with a specific
+    agent/body, so we'll try to grab them dynamically by checking the transmission ids
+    (the joint/site adrs associated with that actuator) and seeing if that the
+    corresponding root body is on this agent's body.
+    """
+    model = spec.model
+
+    # Root body for the agent
+    body_id = spec.get_body_id(body_name)
+    assert body_id != -1, f"Could not find body with name {body_name}."
+
+    # The body id of each actuator is gathered per transmission type at once.
+    trnids = model.actuator_trnid[:, 0]
+    trntypes = model.actuator_trntype
+    trn_bodyids = {
+        mj.mjtTrn.mjTRN_JOINT: model.jnt_bodyid,
+        mj.mjtTrn.mjTRN_JOINTINPARENT: model.jnt_bodyid,
+        mj.mjtTrn.mjTRN_SITE: model.site_bodyid,
+        mj.mjtTrn.mjTRN_BODY: np.arange(model.nbody),
+        mj.mjtTrn.mjTRN_TENDON: model.tendon_adr,
+    }
+    act_bodyids = np.empty_like(trnids)
+    supported = np.zeros_like(trnids, dtype=bool)
+    for trntype, bodyids in trn_bodyids.items():
+        mask = trntypes == int(trntype)
+        act_bodyids[mask] = bodyids[trnids[mask]]
+        supported |= mask
+    if not np.all(supported):
+        trntype = trntypes[np.argmin(supported)]
+        raise NotImplementedError(f'Unsupported trntype "{trntype}".')
+
+    # Add the actuators whose rootbody is the same body as the agent's body. The
+    # ctrlrange is copied so that the actuators don't hold a reference to the model.
+    actadrs = np.flatnonzero(model.body_rootid[act_bodyids] == body_id)
+    actuators = [
+        MjCambrianActuator(
+            actadr,
+            trnids[actadr],
+            model.actuator_ctrlrange[actadr].copy(),
+            model.actuator_ctrllimited[actadr],
+        )
+        for actadr in actadrs
+    ]
+
+    # Get the joints
+    # We use the joints to get the qpos/qvel as observations (joint specific states)
+    jntadrs = np.flatnonzero(model.body_rootid[model.jnt_bodyid] == body_id)
+    joints = [MjCambrianJoint.create(model, jntadr) for jntadr in jntadrs]
+
+    return actuators, joints
+
+
+@lru_cache(maxsize=64)
+def _parse_agent_xml(xml: str, body_name: str, geom_name: str) -> Tuple[
+    int,
+    int,
+    MjCambrianGeometry,
+    Tuple[MjCambrianActuator, ...],
+    Tuple[MjCambrianJoint, ...],
+]:
+    """Compiles the standalone spec for an agent's xml and returns what's needed
+    before the environment is built: the number of qpos and ctrl, the geometry used
+    for eye placement, and the actuators/joints. Only this summary is cached (not the
+    compiled spec), such that agents with identical xml (i.e. across vectorized envs)
+    share a single compile. The returned values must be treated as read-only.
+
+    Note:
+        The ids/adrs will be different once the entire model is loaded.
+    """
+    spec = spec_from_xml_string(xml)
+    model = spec.model
+
+    geom_id = spec.get_geom_id(geom_name)
+    assert geom_id != -1, f"Could not find geom {geom_name}."
+    geom_rbound = float(model.geom_rbound[geom_id])
+    geom_pos = model.geom_pos[geom_id].copy()
+    geom = MjCambrianGeometry(geom_id, geom_rbound, geom_pos)
+
+    actuators, joints = _parse_actuators(spec, body_name)
+    return model.nq, model.nu, geom, tuple(actuators), tuple(joints)
+
+
 @config_wrapper
 class MjCambrianAgentConfig(HydraContainerConfig):
     """Defines the config for an agent. Used for type hinting.
@@ -130,6 +219,11 @@ class MjCambrianAgent:
         self._config = config
         self._name = name
 
+        # These are read every step, so cache them to avoid the config lookups
+        self._check_contacts = bool(config.check_contacts)
+        self._use_action_obs = bool(config.use_action_obs)
+        self._use_contact_obs = bool(config.use_contact_obs)
+
         self._eyes: Dict[str, MjCambrianEye] = {}
 
         self._spec: MjCambrianSpec = None
@@ -137,14 +231,29 @@ class MjCambrianAgent:
         self._init_quat: Tuple[
             float | None, float | None, float | None, float | None
         ] = None
-        self._last_action: List[float] = None
+        self._last_action: ActionType = None
         self._actuators: List[MjCambrianActuator] = []
         self._joints: List[MjCambrianJoint] = []
         self._geom: MjCambrianGeometry = None
         self._body: mj.MjsBody = None
-        self._actadrs: List[int] = []
+        self._qposadrs: np.ndarray = None
+        self._actadrs: np.ndarray = None
+        self._ctrl_center: np.ndarray = None
+        self._ctrl_halfspan: np.ndarray = None
+        self._ctrl_inv_halfspan: np.ndarray = None
+        self._ctrl_min: np.ndarray = None
+        self._ctrl_max: np.ndarray = None
+        self._ctrl_buffer: np.ndarray = None
         self._body_id: int = None
+        self._geom_mask: np.ndarray = None
+        self._geom_mask_model: mj.MjModel = None
         self._persistant_overlays: List[MjCambrianViewerOverlay] = []
+        self._name_overlay_text = f"Agent: {name}"
+
+        # The site overlay color is inverted when the agent has contacts
+        r, g, b, a = config.overlay_color
+        self._overlay_colors = ((r, g, b, a), (1 - r, 1 - g, 1 - b, a))
+
         self._initialize()
 
     def _initialize(self):
@@ -156,51 +265,32 @@ class MjCambrianAgent:
             - place eyes at the appropriate locations
         """
         try:
-            spec = spec_from_xml_string(self._config.xml)
+            numqpos, numctrl, geom, actuators, joints = _parse_agent_xml(
+                self._config.xml, self._config.body_name, self._config.geom_name
+            )
         except Exception:
             get_logger().error(f"Error creating model\n{self._config.xml}")
             raise
 
-        self._parse_geometry(spec)
-        self._parse_actuators(spec)
-
-        self._create_eyes()
-
-        assert len(self._config.init_pos) == 3, "init_pos must have 3 elements."
-        self._init_pos = self._config.init_pos
-        assert len(self._config.init_quat) == 4, "init_quat must have 4 elements."
-        self._init_quat = self._config.init_quat
-
-    def _parse_geometry(self, spec: MjCambrianSpec):
-        """Parse the geometry to get the root body, number of controls, joints, and
-        actuators. We're going to do some preprocessing of the model here to get info
-        regarding num joints, num controls, etc. This is because we need to know this
-        to compute the observation and action spaces, which is needed _before_ actually
-        initializing mujoco (but we can't get this information until after mujoco is
-        initialized and we don't want to hardcode this for extensibility).
-
-        Note:
-            We can't grab the ids/adrs here because they'll be different once we load
-            the entire model
-        """
-        model = spec.model
-
         # Num of controls
         if self.trainable:
-            assert model.nu > 0, "Trainable agents must have controllable actuators."
+            assert numctrl > 0, "Trainable agents must have controllable actuators."
 
         # Get number of qpos/qvel/ctrl
         # Just stored for later, like to get the observation space, etc.
-        self._numqpos = model.nq
-        self._numctrl = model.nu
+        self._numqpos = numqpos
+        self._numctrl = numctrl
 
-        # Create the geometries we will use for eye placement
-        geom_id = spec.get_geom_id(self._config.geom_name)
-        assert geom_id != -1, f"Could not find geom {self._config.geom_name}."
-        geom_rbound = model.geom_rbound[geom_id]
-        geom_pos = model.geom_pos[geom_id]
+        # The geometry is copied since its id is updated on reset
+        self._geom = replace(geom)
+        self._set_actuators(list(actuators), list(joints))
 
-        self._geom = MjCambrianGeometry(geom_id, geom_rbound, geom_pos)
+        self._create_eyes()
+
+        assert len(self._config.init_pos) == 3, "init_pos must have 3 elements."
+        self._init_pos = self._config.init_pos
+        assert len(self._config.init_quat) == 4, "init_quat must have 4 elements."
+        self._init_quat = self._config.init_quat
 
     def _parse_actuators(self, spec: MjCambrianSpec):
         """Parse the current model/xml for the actuators.
@@ -209,55 +299,16 @@ class MjCambrianAgent:
         on the actuators (for the obs space). And then later to acquire the actual
         ids/adrs.
         """
-        model = spec.model
-
-        # Root body for the agent
-        body_name = self._config.body_name
-        body_id = spec.get_body_id(body_name)
-        assert body_id != -1, f"Could not find body with name {body_name}."
+        self._set_actuators(*_parse_actuators(spec, self._config.body_name))
 
-        # Mujoco doesn't have a neat way to grab the actuators associated with a
-        # specific agent/body, so we'll try to grab them dynamically by checking the
-        # transmission ids (the joint/site adrs associated with that actuator) and
-        # seeing if that the corresponding root body is on this agent's body.
-        self._actuators: List[MjCambrianActuator] = []
-        for actadr, ((trnid, _), trntype) in enumerate(
-            zip(model.actuator_trnid, model.actuator_trntype)
-        ):
-            # Grab the body id associated with the actuator
-            if (
-                trntype == mj.mjtTrn.mjTRN_JOINT
-                or trntype == mj.mjtTrn.mjTRN_JOINTINPARENT
-            ):
-                act_bodyid = model.jnt_bodyid[trnid]
-            elif trntype == mj.mjtTrn.mjTRN_SITE:
-                act_bodyid = model.site_bodyid[trnid]
-            elif trntype == mj.mjtTrn.mjTRN_BODY:
-                act_bodyid = trnid
-            elif trntype == mj.mjtTrn.mjTRN_TENDON:
-                act_bodyid = model.tendon_adr[trnid]
-            else:
-                raise NotImplementedError(f'Unsupported trntype "{trntype}".')
-
-            # Add the actuator if the rootbody of the actuator is the same body
-            # as the transimission's body
-            act_rootbodyid = model.body_rootid[act_bodyid]
-            if act_rootbodyid == body_id:
-                ctrlrange = model.actuator_ctrlrange[actadr]
-                ctrllimited = model.actuator_ctrllimited[actadr]
-                self._actuators.append(
-                    MjCambrianActuator(actadr, trnid, ctrlrange, ctrllimited)
-                )
-
-        # Get the joints
-        # We use the joints to get the qpos/qvel as observations (joint specific states)
-        self._joints: List[MjCambrianJoint] = []
-        for jntadr, jnt_bodyid in enumerate(model.jnt_bodyid):
-            jnt_rootbodyid = model.body_rootid[jnt_bodyid]
-            if jnt_rootbodyid == body_id:
-                # This joint is associated with this agent's body
-                self._joints.append(MjCambrianJoint.create(model, jntadr))
+    def _set_actuators(
+        self, actuators: List[MjCambrianActuator], joints: List[MjCambrianJoint]
+    ):
+        """Sets the actuators and joints of the agent and validates them."""
+        self._actuators = actuators
+        self._joints = joints
 
+        body_name = self._config.body_name
         assert (
             len(self._joints) > 0
         ), f"Body {body_name} has no joints. Joints are required for positioning."
@@ -275,9 +326,13 @@ class MjCambrianAgent:
         """
         xml = MjCambrianXML.from_string(self._config.xml)
 
-        # Add eyes
-        for eye in self.eyes.values():
-            xml += eye.generate_xml(xml, self._geom, self._config.body_name)
+        # Add eyes. The path to the parent body is the same in the base xml, so the eye
+        # xmls are generated from it and merged in a single pass.
+        body_name = self._config.body_name
+        eye_xmls = [
+            eye.generate_xml(xml, self._geom, body_name) for eye in self.eyes.values()
+        ]
+        xml.extend(eye_xmls)
 
         return xml
 
@@ -291,11 +346,29 @@ class MjCambrianAgent:
         self._last_action = actions.copy()
         if len(actions) == 0:
             return
+        elif len(actions) == len(self._actadrs):
+            self._apply_ctrl(actions)
+            return
 
-        for action, actuator in zip(actions, self._actuators):
-            if actuator.ctrllimited:
-                action = np.interp(action, [-1, 1], actuator.ctrlrange)
-            self._spec.data.ctrl[actuator.adr] = action
+        # Only the first n actuators are set if fewer actions are passed. The ctrl is
+        # computed in place in a preallocated buffer to avoid temporaries every step.
+        n = min(len(actions), len(self._actadrs))
+        ctrl = self._ctrl_buffer[:n]
+        np.multiply(actions[:n], self._ctrl_halfspan[:n], out=ctrl)
+        ctrl += self._ctrl_center[:n]
+        np.clip(ctrl, self._ctrl_min[:n], self._ctrl_max[:n], out=ctrl)
+        self._spec.data.ctrl[self._actadrs[:n]] = ctrl
+
+    def _apply_ctrl(self, actions: np.ndarray):
+        """Maps normalized actions for _all_ of the agent's actuators to the ctrl.
+        Same as `apply_action` without the bookkeeping (i.e. `last_action` isn't
+        updated), so subclasses which already build a full action array can write it
+        directly."""
+        ctrl = self._ctrl_buffer
+        np.multiply(actions, self._ctrl_halfspan, out=ctrl)
+        ctrl += self._ctrl_center
+        np.clip(ctrl, self._ctrl_min, self._ctrl_max, out=ctrl)
+        self._spec.data.ctrl[self._actadrs] = ctrl
 
     def get_action_privileged(self, env: "MjCambrianEnv") -> List[float]:
         """This is a deviation from the standard gym API. This method is similar to
@@ -332,13 +405,10 @@ class MjCambrianAgent:
         # Reset the pose of the agent
         self._reset_pose(spec)
 
-        # Set the last action to whatever the last ctrl was
-        self._last_action = []
-        for actuator in self._actuators:
-            action = self._spec.data.ctrl[actuator.adr]
-            if actuator.ctrllimited:
-                action = np.interp(action, [-1, 1], actuator.ctrlrange)
-            self._last_action.append(action)
+        # Set the last action to whatever the last ctrl was. This is the inverse of
+        # the affine map used in `apply_action`, so the action is in [-1, 1].
+        ctrl = self._spec.data.ctrl[self._actadrs]
+        self._last_action = (ctrl - self._ctrl_center) * self._ctrl_inv_halfspan
 
         obs: Dict[str, Any] = {}
         for name, eye in self.eyes.items():
@@ -370,11 +440,27 @@ class MjCambrianAgent:
         self._geom.id = geom_id
 
         # Accumulate the qposadrs
-        self._qposadrs = []
-        for joint in self._joints:
-            self._qposadrs.extend(joint.qposadrs)
+        self._qposadrs = np.array(
+            [adr for joint in self._joints for adr in joint.qposadrs], dtype=int
+        )
 
-        self._actadrs: List[int] = [act.adr for act in self._actuators]
+        # Cache the actuator adrs and the affine map from the normalized [-1, 1]
+        # action to the ctrlrange so `apply_action` is a single vectorized op.
+        # Actuators which aren't ctrllimited map identically and aren't clipped, so
+        # clipping in ctrl space is equivalent to clipping the action to [-1, 1].
+        self._actadrs = np.array([act.adr for act in self._actuators], dtype=int)
+        ctrlrange = np.array(
+            [act.ctrlrange for act in self._actuators], dtype=np.float64
+        ).reshape(-1, 2)
+        ctrllimited = np.array([act.ctrllimited for act in self._actuators], dtype=bool)
+        self._ctrl_center = np.where(ctrllimited, ctrlrange.mean(axis=1), 0.0)
+        self._ctrl_halfspan = np.where(
+            ctrllimited, (ctrlrange[:, 1] - ctrlrange[:, 0]) / 2, 1.0
+        )
+        self._ctrl_inv_halfspan = 1.0 / self._ctrl_halfspan
+        self._ctrl_min = np.where(ctrllimited, ctrlrange[:, 0], -np.inf)
+        self._ctrl_max = np.where(ctrllimited, ctrlrange[:, 1], np.inf)
+        self._ctrl_buffer = np.zeros(len(self._actadrs), dtype=np.float64)
 
         assert (
             len(self._qposadrs) == self._numqpos
@@ -396,7 +482,7 @@ class MjCambrianAgent:
         if self._config.perturb_init_pos:
             pos = np.random.normal(0, self._geom.rbound / 2, 2)
             pos = np.clip(pos, -self._geom.rbound / 2, self._geom.rbound / 2)
-            self.pos += [*pos, 0]
+            spec.data.qpos[self._qposadrs[:2]] += pos
 
     def step(self) -> ObsType:
         """Steps the eyes and returns the observation."""
@@ -413,9 +499,9 @@ class MjCambrianAgent:
 
     def _update_obs(self, obs: ObsType) -> ObsType:
         """Add additional attributes to the observation."""
-        if self._config.use_action_obs:
+        if self._use_action_obs:
             obs["action"] = self._last_action
-        if self._config.use_contact_obs:
+        if self._use_contact_obs:
             obs["contacts"] = [self.has_contacts]
 
         return obs
@@ -430,15 +516,12 @@ class MjCambrianAgent:
         create_site_overlay = MjCambrianViewerOverlay.create_site_overlay
 
         # Add text overlays
-        overlays.append(create_text_overlay(f"Agent: {self.name}"))
+        overlays.append(create_text_overlay(self._name_overlay_text))
         action = f"Action: {', '.join([f'{a:.3f}' for a in self.last_action])}"
         overlays.append(create_text_overlay(action))
         if self._config.overlay_size > 0:
-            rgba = self._config.overlay_color
+            rgba = self._overlay_colors[self.has_contacts]
             size = self._config.overlay_size
-            if self.has_contacts:
-                # Invert the color if there are contacts
-                rgba = (1 - rgba[0], 1 - rgba[1], 1 - rgba[2], rgba[3])
             site_overlay = create_site_overlay(self.pos.copy(), rgba, size)
             self._persistant_overlays.append(site_overlay)
 
@@ -453,32 +536,33 @@ class MjCambrianAgent:
     def has_contacts(self) -> bool:
         """Returns whether or not the agent has contacts.
 
-        Walks through all the contacts in the environment and checks if any of them
-        involve this agent.
+        Checks all the contacts in the environment at once and returns True if any
+        non-excluded contact involves this agent.
         """
-        if not self._config.check_contacts:
+        if not self._check_contacts:
             return False
 
-        for contact in self._spec.data.contact:
-            if contact.exclude:
-                continue
-
-            geom1 = int(contact.geom[0])
-            body1 = self._spec.model.geom_bodyid[geom1]
-            rootbody1 = self._spec.model.body_rootid[body1]
-
-            geom2 = int(contact.geom[1])
-            body2 = self._spec.model.geom_bodyid[geom2]
-            rootbody2 = self._spec.model.body_rootid[body2]
+        data = self._spec.data
+        if data.ncon == 0:
+            return False
 
-            is_this_agent = rootbody1 == self._body_id or rootbody2 == self._body_id
-            if not is_this_agent or contact.exclude:
-                # Not a contact with this agent
-                continue
+        # contact.geom is (ncon, 2); lookup whether each geom belongs to this agent
+        contact = data.contact
+        is_this_agent = np.any(self._get_geom_mask()[contact.geom], axis=1)
+        return bool(np.any(is_this_agent & (contact.exclude == 0)))
 
-            return True
+    def _get_geom_mask(self) -> np.ndarray:
+        """Returns a mask over all the geoms in the model which is True for the geoms
+        that belong to this agent (i.e. their root body is the agent's body).
 
-        return False
+        The model is replaced when the spec is recompiled, so the mask is cached per
+        model rather than on reset.
+        """
+        model = self._spec.model
+        if self._geom_mask_model is not model:
+            self._geom_mask = model.body_rootid[model.geom_bodyid] == self._body_id
+            self._geom_mask_model = model
+        return self._geom_mask
 
     @cached_property
     def observation_space(self) -> spaces.Space:
@@ -498,9 +582,9 @@ class MjCambrianAgent:
             else:
                 observation_space[name] = eye.observation_space
 
-        if self._config.use_action_obs:
+        if self._use_action_obs:
             observation_space["action"] = self.action_space
-        if self._config.use_contact_obs:
+        if self._use_contact_obs:
             observation_space["contacts"] = spaces.Box(
                 low=0, high=1, shape=(1,), dtype=np.int32
             )
@@ -525,20 +609,25 @@ class MjCambrianAgent:
         return self._eyes
 
     @property
-    def last_action(self) -> List[float]:
+    def last_action(self) -> ActionType:
         return self._last_action
 
+    @property
+    def body_id(self) -> int:
+        """Returns the id of the agent's root body in the model."""
+        return self._body_id
+
     @property
     def qpos(self) -> np.ndarray:
         """Gets the qpos of the agent. The qpos is the state of the joints defined
-        in the agent's xml. This method is used to get the state of the qpos. It's
-        actually a masked array where the entries are masked if the qpos adr is not
-        associated with the agent. This allows the return value to be indexed
-        and edited as if it were the full qpos array."""
-        mask = np.ones(self._spec.data.qpos.shape, dtype=bool)
-        mask[self._qposadrs] = False
-        masked_qpos = np.ma.masked_array(self._spec.data.qpos, mask=mask)
-        return masked_qpos[np.flatnonzero(~masked_qpos.mask)]
+        in the agent's xml. This method is used to get the state of the qpos. The
+        entries are ordered as the agent's qpos adrs.
+
+        Note:
+            The returned value is a copy, so editing it doesn't directly impact the
+            simulation. To set the qpos of the agent, use the `qpos` setter.
+        """
+        return self._spec.data.qpos[self._qposadrs]
 
     @qpos.setter
     def qpos(self, value: np.ndarray[float | None]):
@@ -551,19 +640,28 @@ class MjCambrianAgent:
         agent. If this is the case, only the first `len(value)` joints will be
         updated.
         """
-        for idx, val in enumerate(value):
+        self._set_qpos(value)
+
+    def _set_qpos(self, value: np.ndarray[float | None], *, offset: int = 0):
+        """Helper method to set the qpos of the agent. `value[i]` is written to the
+        `offset + i`-th qpos adr of the agent, unless it's None."""
+        qpos, adrs = self._spec.data.qpos, self._qposadrs
+        for idx, val in enumerate(value, start=offset):
             if val is not None:
-                self._spec.data.qpos[self._qposadrs[idx]] = val
+                qpos[adrs[idx]] = val
 
     @property
     def pos(self) -> np.ndarray:
         """Returns the position of the agent in the environment.
 
         Note:
-            the returned value, if edited, doesn't not directly impact the simulation.
+            The returned value is a read-only view into the simulation data, so it
+            will change as the simulation is stepped. Copy it if it needs to be stored.
             To set the position of the agent, use the `pos` setter.
         """
-        return self._spec.data.xpos[self._body_id].copy()
+        pos = self._spec.data.xpos[self._body_id]
+        pos.flags.writeable = False
+        return pos
 
     @pos.setter
     def pos(self, value: Tuple[float | None, float | None, float | None]):
@@ -577,9 +675,7 @@ class MjCambrianAgent:
             the joints defined in the agent, so this method should be overridden in the
             subclass if this is not the case.
         """
-        for idx, val in enumerate(value):
-            if val is not None:
-                self._spec.data.qpos[self._qposadrs[idx]] = val
+        self._set_qpos(value)
 
     @property
     def init_pos(self) -> Tuple[float | None, float | None, float | None]:
@@ -607,10 +703,13 @@ class MjCambrianAgent:
         """Returns the quaternion of the agent in the environment. Fmt: `wxyz`.
 
         Note:
-            The returned value, if edited, doesn't not directly impact the simulation.
+            The returned value is a read-only view into the simulation data, so it
+            will change as the simulation is stepped. Copy it if it needs to be stored.
             To set the quaternion of the agent, use the `quat` setter.
         """
-        return self._spec.data.xquat[self._body_id].copy()
+        quat = self._spec.data.xquat[self._body_id]
+        quat.flags.writeable = False
+        return quat
 
     @quat.setter
     def quat(
@@ -626,9 +725,7 @@ class MjCambrianAgent:
             case and depends on the joints defined in the agent, so this method should
             be overridden in the subclass if this is not the case.
         """
-        for idx, val in enumerate(value):
-            if val is not None:
-                self._spec.data.qpos[self._qposadrs[3 + idx]] = val
+        self._set_qpos(value, offset=3)
 
     @property
     def trainable(self) -> bool:
@@ -658,7 +755,7 @@ class MjCambrianAgent2D(MjCambrianAgent):
         if any(val is None for val in value):
             return
 
-        self.qpos[self._qposadrs[2]] = np.arctan2(
-            2 * (value[0] * value[3] + value[1] * value[2]),
-            1 - 2 * (value[2] ** 2 + value[3] ** 2),
-        )
+        # math.atan2 is much cheaper than np.arctan2 for a single scalar
+        w, x, y, z = value
+        yaw = math.atan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+        self._spec.data.qpos[self._qposadrs[2]] = yaw
@@ -1,5 +1,6 @@
 """Point agents."""
 
+import math
 from functools import cached_property
 from typing import Optional, Tuple
 
@@ -12,6 +13,13 @@ from cambrian.utils import get_logger
 from cambrian.utils.types import ActionType, ObsType
 
 
+def _normalize(value: float, low: float, high: float) -> float:
+    """Maps a scalar from [low, high] to [-1, 1], clamping at the ends. Equivalent to
+    np.interp(value, [low, high], [-1, 1]) without the array overhead."""
+    value = (value - low) / (high - low) * 2.0 - 1.0
+    return min(max(value, -1.0), 1.0)
+
+
 class MjCambrianAgentPoint(MjCambrianAgent2D):
     """
     This is a hardcoded class which implements the agent as actuated by a forward
@@ -46,19 +54,22 @@ class MjCambrianAgentPoint(MjCambrianAgent2D):
             f"Forward velocity and lateral velocity must have the same control range, "
             f"got {self._actuators[0].ctrlrange} and {self._actuators[1].ctrlrange}"
         )
-        self._v_ctrlrange = np.array([0, 1])
+        self._v_ctrlrange = (0.0, 1.0)
         self._theta_ctrlrange = self._actuators[2].ctrlrange
 
+        # Reused across steps to pass the global velocities to the base apply_action
+        self._action_buffer = np.zeros(3, dtype=np.float64)
+
     def _update_obs(self, obs: ObsType) -> ObsType:
         """Creates the entire obs dict."""
         obs = super()._update_obs(obs)
 
         # Update the action obs
         # Calculate the global velocities
-        if self._config.use_action_obs:
+        if self._use_action_obs:
             v, theta = self._calc_v_theta(self._last_action)
-            v = np.interp(v, self._v_ctrlrange, [-1, 1])
-            theta = np.interp(theta, self._theta_ctrlrange, [-1, 1])
+            v = _normalize(v, *self._v_ctrlrange)
+            theta = _normalize(theta, *self._theta_ctrlrange)
             obs["action"] = np.array([v, theta], dtype=np.float32)
 
         return obs
@@ -66,21 +77,30 @@ class MjCambrianAgentPoint(MjCambrianAgent2D):
     def _calc_v_theta(self, action: Tuple[float, float, float]) -> Tuple[float, float]:
         """Calculates the v and theta from the action."""
         vx, vy, _ = action
-        v = np.hypot(vx, vy)
-        theta = np.arctan2(vy, vx) - self.qpos[2]
+        v = math.hypot(vx, vy)
+        theta = math.atan2(vy, vx) - self._spec.data.qpos[self._qposadrs[2]]
         return v, theta
 
     def apply_action(self, action: ActionType):
         """Calls the appropriate apply action method based on the heading joint type."""
         assert len(action) == 2, f"Action must have two elements, got {len(action)}."
 
-        # Calculate global velocities
-        v = np.interp(action[0], [-1, 1], self._v_ctrlrange)
-        current_heading = self.qpos[2]
-        vx = v * np.cos(current_heading)
-        vy = v * np.sin(current_heading)
+        # Validated once above; unpack to python floats since scalar math on numpy
+        # scalars is much slower
+        forward, heading = float(action[0]), float(action[1])
+
+        # Calculate global velocities. This is equivalent to
+        # np.interp(forward, [-1, 1], self._v_ctrlrange), but in closed form.
+        v_min, v_max = self._v_ctrlrange
+        v = v_min + (min(max(forward, -1.0), 1.0) + 1.0) * 0.5 * (v_max - v_min)
+        current_heading = float(self._spec.data.qpos[self._qposadrs[2]])
+        self._action_buffer[0] = v * math.cos(current_heading)
+        self._action_buffer[1] = v * math.sin(current_heading)
+        self._action_buffer[2] = heading
 
-        super().apply_action([vx, vy, action[1]])
+        # The buffer already covers all three actuators, so write the ctrl directly
+        self._last_action = self._action_buffer.copy()
+        self._apply_ctrl(self._action_buffer)
 
     @cached_property
     def action_space(self) -> spaces.Space:
@@ -121,11 +141,16 @@ class MjCambrianAgentPointSeeker(MjCambrianAgentPoint):
         self._target = target
         self._speed = speed
         self._distance_threshold = distance_threshold
+        self._distance_threshold_sq = distance_threshold**2
 
         self._optimal_trajectory: np.ndarray = None
         self._use_optimal_trajectory = use_optimal_trajectory
 
         self._prev_target_pos: np.ndarray = None
+        self._target_idx: int | None = None
+
+        # Reused across steps for the returned privileged action
+        self._action_out = np.zeros(2, dtype=np.float32)
 
     def reset(self, *args) -> ObsType:
         """Resets the optimal_trajectory."""
@@ -145,16 +170,20 @@ class MjCambrianAgentPointSeeker(MjCambrianAgentPoint):
             else:
                 target_pos = self._optimal_trajectory[0]
         else:
-            assert self._target in env.agents, f"Target {self._target} not found in env"
-            target_pos = env.agents[self._target].pos
+            if self._target_idx is None:
+                assert self._target in env.agents, f"Target {self._target} not found"
+                self._target_idx = env.agent_indices[self._target]
+            target_pos = env.agent_positions[self._target_idx].copy()
 
         if self._prev_target_pos is None:
             self._prev_target_pos = target_pos
 
-        # Calculate the optimal trajectory if the current trajectory is None
+        # Calculate the optimal trajectory if the current trajectory is None or the
+        # target moved more than 0.1 (compared squared to avoid the sqrt)
+        target_delta = target_pos - self._prev_target_pos
         if (
             self._optimal_trajectory is None
-            or np.linalg.norm(target_pos - self._prev_target_pos) > 0.1
+            or np.dot(target_delta, target_delta) > 0.1**2
         ):
             if self._use_optimal_trajectory:
                 obstacles = []
@@ -174,6 +203,10 @@ class MjCambrianAgentPointSeeker(MjCambrianAgentPoint):
             else:
                 self._optimal_trajectory = np.array([target_pos[:2]])
 
+            # Update the previous target position so the trajectory is only
+            # recomputed once the target moves again
+            self._prev_target_pos = target_pos
+
         # If the optimal trajectory is empty, then set the optimal trajectory to the
         # target position
         if len(self._optimal_trajectory) == 0:
@@ -182,14 +215,18 @@ class MjCambrianAgentPointSeeker(MjCambrianAgentPoint):
         # Get the current target. If the distance between the current position and the
         # target is less than the threshold, then remove the target from the optimal
         # trajectory
-        target = self._optimal_trajectory[0]
-        target_vector = target - self.pos[:2]
-        distance = np.linalg.norm(target - self.pos[:2])
-        if distance < self._distance_threshold:
+        # NOTE: This is all scalar math, so use `math` to avoid numpy call overhead
+        pos = self.pos
+        dx = float(self._optimal_trajectory[0, 0] - pos[0])
+        dy = float(self._optimal_trajectory[0, 1] - pos[1])
+        if dx * dx + dy * dy < self._distance_threshold_sq:
             self._optimal_trajectory = self._optimal_trajectory[1:]
 
-        # Update the previous target position
-        target_theta = np.arctan2(target_vector[1], target_vector[0])
-        theta_action = np.interp(target_theta, [-np.pi, np.pi], [-1, 1])
+        # atan2 is in [-pi, pi], so mapping it to [-1, 1] is just a division
+        theta_action = math.atan2(dy, dx) / math.pi
 
-        return [self._speed, theta_action]
+        # NOTE: The same buffer is returned every step, so copy it if it needs to be
+        # kept around
+        self._action_out[0] = self._speed
+        self._action_out[1] = theta_action
+        return self._action_out
@@ -70,13 +70,17 @@ def done_if_close_to_agents(
     if not agent_selected(agent, for_agents) or disable:
         return False
 
-    for other_agent in env.agents.values():
-        if not agent_selected(other_agent, to_agents) or other_agent.name == agent.name:
-            continue
+    idx = env.agent_indices[agent.name]
+    indices = np.flatnonzero(env.agents_selected_mask(to_agents))
+    indices = indices[indices != idx]
+    if len(indices) == 0:
+        return False
 
-        if np.linalg.norm(other_agent.pos - agent.pos) < distance_threshold:
-            return True
-    return False
+    # Compare the squared distances to all the other agents at once
+    positions = env.agent_positions
+    diff = positions[indices] - positions[idx]
+    distances_sq = np.einsum("ij,ij->i", diff, diff)
+    return bool(np.any(distances_sq < distance_threshold**2))
 
 
 def done_combined(
@@ -85,5 +89,7 @@ def done_combined(
     info: Dict[str, Any],
     **done_fns,
 ) -> bool:
-    """Combine multiple done functions."""
+    """Combine multiple done functions. The done functions are evaluated in order,
+    and evaluation stops at the first one which returns True. The env orders them
+    from cheapest to most expensive and drops the disabled ones when it's created."""
     return any(done_fn(env, agent, info) for done_fn in done_fns.values())
@@ -3,9 +3,11 @@
 import pickle
 import time
 from collections import deque
+from functools import cached_property, partial
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Self, Tuple
 
+import glfw
 import mujoco as mj
 import numpy as np
 from gymnasium import Env, spaces
@@ -19,6 +21,7 @@ from cambrian.renderer import (
     MjCambrianRendererSaveMode,
 )
 from cambrian.renderer.overlays import MjCambrianCursor, MjCambrianViewerOverlay
+from cambrian.utils import agents_selected_mask
 from cambrian.utils.cambrian_xml import MjCambrianXML, MjCambrianXMLConfig
 from cambrian.utils.logger import get_logger
 from cambrian.utils.spec import MjCambrianSpec, spec_from_xml
@@ -39,6 +42,88 @@ from cambrian.utils.types import (
 # ======================
 
 
+def _is_done_never(done_fn: Callable) -> bool:
+    """Checks whether a done fn will always return False, i.e. it's `done_never` or a
+    `done_combined` whose done fns are all either disabled or never done. Done fns are
+    matched by name since the done fns module depends on this one."""
+    func = getattr(done_fn, "func", done_fn)
+    name = getattr(func, "__name__", None)
+    if name == "done_never":
+        return True
+    elif name == "done_combined":
+        return all(
+            getattr(fn, "keywords", {}).get("disable", False) or _is_done_never(fn)
+            for fn in getattr(done_fn, "keywords", {}).values()
+        )
+    return False
+
+
+# Approximate relative cost of each done fn. Used by `_prepare_done_fn` to order the
+# done fns of a `done_combined` so that the cheap checks are evaluated first and can
+# short-circuit the more expensive ones. Unknown fns are evaluated last.
+_DONE_FN_COSTS: Dict[str, int] = {
+    "cambrian.envs.done_fns.done_never": 0,
+    "cambrian.envs.done_fns.done_if_exceeds_max_episode_steps": 1,
+    "cambrian.envs.done_fns.done_if_low_reward": 1,
+    "cambrian.envs.done_fns.done_if_has_contacts": 2,
+    "cambrian.envs.done_fns.done_if_close_to_agents": 3,
+}
+
+
+def _prepare_done_fn(done_fn: Callable) -> Callable:
+    """Prepares a done fn to be called each step. If it's a `done_combined`, its done
+    fns are sorted by their approximate cost and the ones which are bound with
+    `disable=True` (they'd always return False) are dropped. Like `_is_done_never`,
+    the done fns are matched by name, but the costs are keyed on the qualified name
+    so that user fns which happen to share a name aren't reordered."""
+    func = getattr(done_fn, "func", done_fn)
+    if getattr(func, "__name__", None) != "done_combined":
+        return done_fn
+
+    def cost(item: Tuple[str, Callable]) -> int:
+        fn = getattr(item[1], "func", item[1])
+        name = f"{getattr(fn, '__module__', None)}.{getattr(fn, '__name__', None)}"
+        return _DONE_FN_COSTS.get(name, len(_DONE_FN_COSTS))
+
+    done_fns = {
+        name: _prepare_done_fn(fn)
+        for name, fn in sorted(done_fn.keywords.items(), key=cost)
+        if not getattr(fn, "keywords", {}).get("disable", False)
+    }
+    return partial(func, *done_fn.args, **done_fns)
+
+
+def _prepare_reward_fn(reward_fn: Callable) -> Callable:
+    """Prepares a reward fn to be called each step. If it's a `reward_combined`, the
+    reward fns which are bound with `disable=True` (they'd always return 0) are
+    dropped and the exclusive fn names are converted to a tuple. Like
+    `_is_done_never`, the reward fns are matched by name."""
+    func = getattr(reward_fn, "func", reward_fn)
+    if getattr(func, "__name__", None) != "reward_combined":
+        return reward_fn
+
+    reward_fns = {
+        name: fn
+        for name, fn in reward_fn.keywords.items()
+        if name != "exclusive_fns"
+        and not getattr(fn, "keywords", {}).get("disable", False)
+    }
+    exclusive_fns = tuple(reward_fn.keywords.get("exclusive_fns", ()))
+    return partial(func, *reward_fn.args, exclusive_fns=exclusive_fns, **reward_fns)
+
+
+def _is_step_noop(step_fn: Callable) -> bool:
+    """Checks whether a step fn will always return the obs and info unchanged, i.e.
+    it's a `step_combined` without any step fns. Like `_is_done_never`, the step fns
+    are matched by name."""
+    func = getattr(step_fn, "func", step_fn)
+    if getattr(func, "__name__", None) == "step_combined":
+        return all(
+            _is_step_noop(fn) for fn in getattr(step_fn, "keywords", {}).values()
+        )
+    return False
+
+
 @config_wrapper
 class MjCambrianEnvConfig(HydraContainerConfig):
     """Defines a config for the cambrian environment.
@@ -134,6 +219,42 @@ class MjCambrianEnv(ParallelEnv, Env):
         self._agents: Dict[str, MjCambrianAgent] = {}
         self._create_agents()
 
+        # The agents which compute their own (privileged) actions. This is fixed for the
+        # env, so it's computed once rather than checking the agent configs every step.
+        self._privileged_agents: Dict[str, MjCambrianAgent] = {
+            name: agent
+            for name, agent in self._agent_items
+            if not agent.trainable or agent.config.use_privileged_action
+        }
+
+        # The positions of all the agents are stored contiguously (in the same order as
+        # `agents`) so that the done/reward fns can operate on them at once. The
+        # buffer is refreshed after each simulation step.
+        self._agent_indices = {name: i for i, name in enumerate(self._agent_names)}
+        self._agents_selected_masks: Dict[Tuple[str, ...] | None, np.ndarray] = {}
+        self._agent_body_ids: np.ndarray = None
+        self._agent_positions = np.zeros((len(self._agents), 3), dtype=np.float64)
+        self._prev_agent_positions = np.zeros_like(self._agent_positions)
+        self._contact_geom_agents: np.ndarray = None
+        self._contact_geom_agents_model: mj.MjModel = None
+        self._has_contacts = np.zeros(len(self._contact_items), dtype=bool)
+
+        # Done fns which can never return True are skipped entirely when computing the
+        # termination/truncation, rather than being called once per agent each step.
+        # Likewise, a step fn which doesn't do anything isn't called.
+        self._never_terminated = _is_done_never(self._config.termination_fn)
+        self._never_truncated = _is_done_never(self._config.truncation_fn)
+        self._skip_step_fn = _is_step_noop(self._config.step_fn)
+
+        # These are read every step, and going through the config on each access is
+        # much slower than a plain attribute, so keep a reference to them
+        self._termination_fn = _prepare_done_fn(self._config.termination_fn)
+        self._truncation_fn = _prepare_done_fn(self._config.truncation_fn)
+        self._reward_fn = _prepare_reward_fn(self._config.reward_fn)
+        self._step_fn = self._config.step_fn
+        self._frame_skip = self._config.frame_skip
+        self._debug_overlays_size = self._config.debug_overlays_size
+
         self._xml = self.generate_xml()
         try:
             self._spec = spec_from_xml(self._xml)
@@ -162,6 +283,8 @@ class MjCambrianEnv(ParallelEnv, Env):
         self._record: bool = False
         self._rollout: Dict[str, Any] = {}
         self._overlays: Dict[str, Any] = {}
+        self._overlay_renderer_size: Tuple[int, int] = None
+        self._overlay_size: Tuple[int, int] = None
 
         # We'll store the info dict as a state within this class so that the truncation,
         # termination, and reward functions can use it for keeping a state. Like passing
@@ -179,6 +302,22 @@ class MjCambrianEnv(ParallelEnv, Env):
             assert name not in self._agents, f"Agent {name} already exists."
             self._agents[name] = agent_config.instance(agent_config, name)
 
+        # The agents are fixed after creation, so cache the iterables which are used in
+        # the step loop rather than rebuilding the dict views each time
+        self._agent_items: Tuple[Tuple[str, MjCambrianAgent], ...] = tuple(
+            self._agents.items()
+        )
+        self._agent_names: Tuple[str, ...] = tuple(self._agents.keys())
+        self._agent_values: Tuple[MjCambrianAgent, ...] = tuple(self._agents.values())
+        self._trainable_items: Tuple[Tuple[str, MjCambrianAgent], ...] = tuple(
+            (name, agent) for name, agent in self._agent_items if agent.trainable
+        )
+        self._contact_items: Tuple[Tuple[str, MjCambrianAgent], ...] = tuple(
+            (name, agent)
+            for name, agent in self._agent_items
+            if agent.config.check_contacts
+        )
+
     def generate_xml(self) -> MjCambrianXML:
         """Generates the xml for the environment.
 
@@ -189,7 +328,7 @@ class MjCambrianEnv(ParallelEnv, Env):
         xml = MjCambrianXML.from_string(self._config.xml)
 
         # Add the agents to the xml
-        for agent in self._agents.values():
+        for agent in self._agent_values:
             xml += agent.generate_xml()
 
         return xml
@@ -214,13 +353,20 @@ class MjCambrianEnv(ParallelEnv, Env):
         mj.mj_resetData(self._spec.model, self._spec.data)
 
         # Reset the info dict. We'll update the stateful info dict here, as well.
-        info: Dict[str, Dict[str, Any]] = {a: {} for a in self._agents}
+        # Agents which don't check contacts never have contacts, so their flag is only
+        # set here rather than every step in `_step_mujoco_simulation`.
+        info: Dict[str, Dict[str, Any]] = {
+            name: {"has_contacts": False} for name in self._agent_names
+        }
         self._info = info
 
         # Then, reset the agents
         obs: Dict[str, Dict[str, Any]] = {}
-        for name, agent in self._agents.items():
+        for name, agent in self._agent_items:
             obs[name] = agent.reset(self._spec)
+        self._agent_body_ids = np.array(
+            [agent.body_id for agent in self._agent_values], dtype=int
+        )
 
         # Recompile the model/data
         self._spec.recompile()
@@ -251,12 +397,15 @@ class MjCambrianEnv(ParallelEnv, Env):
             # TODO make this cleaner
             self._rollout.setdefault("actions", [])
             self._rollout["actions"].append(
-                [np.zeros_like(a.action_space.sample()) for a in self._agents.values()]
+                [
+                    np.zeros(a.action_space.shape, dtype=a.action_space.dtype)
+                    for a in self._agent_values
+                ]
             )
             self._rollout.setdefault("positions", [])
-            self._rollout["positions"].append([a.qpos for a in self._agents.values()])
+            self._rollout["positions"].append([a.qpos for a in self._agent_values])
 
-        return self._config.step_fn(self, obs, info)
+        return self._apply_step_fn(obs, info)
 
     def step(
         self, action: ActionType
@@ -279,32 +428,39 @@ class MjCambrianEnv(ParallelEnv, Env):
         """
         info = self._info
 
-        # First, apply the actions to the agents and step the simulation
-        for name, agent in self._agents.items():
-            if not agent.trainable or agent.config.use_privileged_action:
-                if not agent.trainable and name in action:
-                    get_logger().warning(
-                        f"Action for {name} found in action dict. "
-                        "This will be overridden by the agent.",
-                        extra={"once": True},
-                    )
-                action[name] = agent.get_action_privileged(self)
+        # Store the positions prior to stepping, gathering them in one op
+        np.take(
+            self._spec.data.xpos,
+            self._agent_body_ids,
+            axis=0,
+            out=self._prev_agent_positions,
+        )
 
+        # First, apply the actions to the agents and step the simulation
+        for name, agent in self._privileged_agents.items():
+            if not agent.trainable and name in action:
+                get_logger().warning(
+                    f"Action for {name} found in action dict. "
+                    "This will be overridden by the agent.",
+                    extra={"once": True},
+                )
+            action[name] = agent.get_action_privileged(self)
+        for i, (name, agent) in enumerate(self._agent_items):
             assert name in action, f"Action for {name} not found in action dict."
             agent.apply_action(action[name])
-            info[name]["prev_pos"] = agent.pos.copy()
+            info[name]["prev_pos"] = self._prev_agent_positions[i].copy()
             info[name]["action"] = action[name]
 
         # Then, step the mujoco simulation
-        self._step_mujoco_simulation(self._config.frame_skip, info)
+        self._step_mujoco_simulation(self._frame_skip, info)
 
         # We'll then step each agent to render it's current state and get the obs
         obs: Dict[str, Any] = {}
-        for name, agent in self._agents.items():
+        for name, agent in self._agent_items:
             obs[name] = agent.step()
 
         # Call helper methods to update the observations, rewards, terminated, and info
-        obs, info = self._config.step_fn(self, obs, info)
+        obs, info = self._apply_step_fn(obs, info)
         terminated = self._compute_terminated(info)
         truncated = self._compute_truncated(info)
         reward = self._compute_reward(terminated, truncated, info)
@@ -314,13 +470,16 @@ class MjCambrianEnv(ParallelEnv, Env):
         self._cumulative_reward += sum(reward.values())
 
         if self._record:
-            self._rollout["actions"].append(list(action.values()))
-            self._rollout["positions"].append([a.pos for a in self._agents.values()])
-
-        if (
-            self._config.debug_overlays_size > 0
+            # Copy the actions since privileged agents may reuse their action buffers
+            self._rollout["actions"].append([np.copy(a) for a in action.values()])
+            self._rollout["positions"].append(self._agent_positions.copy())
+
+        # The overlays are only displayed by the renderer, so skip updating them if
+        # there isn't one
+        if self._renderer is not None and (
+            self._debug_overlays_size > 0
             and self._record
-            or "human" in self._config.renderer.render_modes
+            or self.render_mode == "human"
         ):
             self._overlays["Name"] = self._name
             self._overlays["Total Timesteps"] = self.num_timesteps
@@ -336,26 +495,77 @@ class MjCambrianEnv(ParallelEnv, Env):
     def _step_mujoco_simulation(self, n_frames: int, info: InfoType):
         """Sets the mujoco simulation. Will step the simulation `n_frames` times, each
         time checking if the agent has contacts."""
-        # Initially set has_contacts to False for all agents
-        for name in self._agents:
-            info[name]["has_contacts"] = False
+        # If no agents check contacts, there's nothing to do between the steps, so the
+        # frame skip is run in a single call to avoid the per-step python overhead.
+        if not self._contact_items:
+            mj.mj_step(self._spec.model, self._spec.data, nstep=n_frames)
+            self._update_agent_positions()
+            return
 
         # Check contacts at _every_ step.
         # NOTE: Doesn't process whether hits are terminal or not
-        for _ in range(n_frames):
-            mj.mj_step(self._spec.model, self._spec.data)
+        model, data = self._spec.model, self._spec.data
+        geom_agents = self._get_contact_geom_agents()
+        has_contacts = self._has_contacts
+        has_contacts.fill(False)
+        for frame in range(n_frames):
+            mj.mj_step(model, data)
 
             # Check for contacts. We won't break here, but we'll store whether an
             # agent has contacts or not. If we didn't store during the simulation
             # step, contact checking would only occur after the frame skip, meaning
             # that, if during the course of the frame skip, the agent hits an object
             # and then moves away, the contact would not be detected.
-            if self._spec.data.ncon > 0:
-                for name, agent in self._agents.items():
-                    if not info[name]["has_contacts"]:
-                        # Only check for has contacts if it hasn't been set to True
-                        # This reduces redundant checks
-                        info[name]["has_contacts"] = agent.has_contacts
+            if data.ncon > 0:
+                # Flag all the agents involved in a (non-excluded) contact at once.
+                # This is equivalent to checking `agent.has_contacts` for each agent.
+                contact = data.contact
+                agents = geom_agents[contact.geom[contact.exclude == 0]]
+                has_contacts[agents[agents >= 0]] = True
+
+                # Once all the agents have contacts, there's nothing left to check, so
+                # the remaining steps are run in a single call
+                if has_contacts.all():
+                    remaining = n_frames - frame - 1
+                    if remaining > 0:
+                        mj.mj_step(model, data, nstep=remaining)
+                    break
+
+        for (name, _), agent_has_contacts in zip(self._contact_items, has_contacts):
+            info[name]["has_contacts"] = bool(agent_has_contacts)
+
+        self._update_agent_positions()
+
+    def _get_contact_geom_agents(self) -> np.ndarray:
+        """Returns an array mapping each geom in the model to the index of the agent in
+        `_contact_items` which it belongs to, or -1 if it doesn't belong to one.
+
+        The model is replaced when the spec is recompiled, so the array is cached per
+        model rather than on reset.
+        """
+        model = self._spec.model
+        if self._contact_geom_agents_model is not model:
+            body_agents = np.full(model.nbody, -1, dtype=int)
+            body_ids = [agent.body_id for _, agent in self._contact_items]
+            body_agents[body_ids] = np.arange(len(body_ids))
+            geom_agents = body_agents[model.body_rootid[model.geom_bodyid]]
+            self._contact_geom_agents = geom_agents
+            self._contact_geom_agents_model = model
+        return self._contact_geom_agents
+
+    def _apply_step_fn(self, obs: ObsType, info: InfoType) -> Tuple[ObsType, InfoType]:
+        """Applies the step fn to the obs and info. The step fn may move agents (i.e.
+        respawn them), so the agent positions are refreshed afterwards. This is done
+        both on reset and step, such that the positions are never stale when read by
+        the privileged actions or the done/reward fns."""
+        if not self._skip_step_fn:
+            obs, info = self._step_fn(self, obs, info)
+        self._update_agent_positions()
+        return obs, info
+
+    def _update_agent_positions(self):
+        """Gathers the agent positions into the `agent_positions` buffer in one op."""
+        self._agent_positions[:] = self._spec.data.xpos[self._agent_body_ids]
 
     def _compute_terminated(self, info: InfoType) -> TerminatedType:
         """Compute whether the env has terminated. Termination indicates success,
@@ -365,9 +575,12 @@ class MjCambrianEnv(ParallelEnv, Env):
         be overridden in subclasses to provide custom termination conditions.
         """
 
+        if self._never_terminated:
+            return dict.fromkeys(self._agent_names, False)
+
         terminated: Dict[str, bool] = {}
-        for name, agent in self._agents.items():
-            terminated[name] = self._config.termination_fn(self, agent, info[name])
+        for name, agent in self._agent_items:
+            terminated[name] = self._termination_fn(self, agent, info[name])
 
         return terminated
 
@@ -379,9 +592,12 @@ class MjCambrianEnv(ParallelEnv, Env):
         be overridden in subclasses to provide custom termination conditions.
         """
 
+        if self._never_truncated:
+            return dict.fromkeys(self._agent_names, False)
+
         truncated: Dict[str, bool] = {}
-        for name, agent in self._agents.items():
-            truncated[name] = self._config.truncation_fn(self, agent, info[name])
+        for name, agent in self._agent_items:
+            truncated[name] = self._truncation_fn(self, agent, info[name])
 
         return truncated
 
@@ -402,8 +618,8 @@ class MjCambrianEnv(ParallelEnv, Env):
         """
 
         rewards: Dict[str, float] = {}
-        for name, agent in self._agents.items():
-            rewards[name] = self._config.reward_fn(
+        for name, agent in self._agent_items:
+            rewards[name] = self._reward_fn(
                 self, agent, terminated[name], truncated[name], info[name]
             )
 
@@ -426,13 +642,12 @@ class MjCambrianEnv(ParallelEnv, Env):
                 self._renderer.height,
                 position=MjCambrianCursor.Position.TOP_LEFT,
             )
+            create_text_overlay = MjCambrianViewerOverlay.create_text_overlay
             for key, value in self._overlays.items():
-                if issubclass(type(value), MjCambrianViewerOverlay):
+                if isinstance(value, MjCambrianViewerOverlay):
                     overlay = value
                 else:
-                    overlay = MjCambrianViewerOverlay.create_text_overlay(
-                        f"{key}: {value}"
-                    )
+                    overlay = create_text_overlay(f"{key}: {value}")
                 cursor = overlay.place(cursor)
                 overlays.append(overlay)
 
@@ -444,17 +659,11 @@ class MjCambrianEnv(ParallelEnv, Env):
     def _generate_overlays(self) -> List[MjCambrianViewerOverlay]:
         overlays: List[MjCambrianViewerOverlay] = []
 
-        renderer_width = self._renderer.width
-        renderer_height = self._renderer.height
-
-        trainable_agents = {n: a for n, a in self._agents.items() if a.trainable}
-        num_agents = len(trainable_agents)
-        overlay_width = int(renderer_width // num_agents) if num_agents > 0 else 0
-        overlay_height = int(renderer_height * self._config.debug_overlays_size)
+        overlay_width, overlay_height = self._get_overlay_size()
         cursor = MjCambrianCursor(
             overlay_width, overlay_height, position=MjCambrianCursor.Position.TOP_LEFT
         )
-        for agent in trainable_agents.values():
+        for _, agent in self._trainable_items:
             agent_overlays = agent.render()
             for overlay in agent_overlays:
                 cursor = overlay.place(cursor)
@@ -465,6 +674,19 @@ class MjCambrianEnv(ParallelEnv, Env):
             cursor.x += overlay_width
         return overlays
 
+    def _get_overlay_size(self) -> Tuple[int, int]:
+        """Returns the width and height of each agent's debug overlays. Only recomputed
+        when the renderer is resized (i.e. the onscreen window)."""
+        renderer_size = (self._renderer.width, self._renderer.height)
+        if renderer_size != self._overlay_renderer_size:
+            renderer_width, renderer_height = renderer_size
+            num_agents = len(self._trainable_items)
+            overlay_width = int(renderer_width // num_agents) if num_agents > 0 else 0
+            overlay_height = int(renderer_height * self._config.debug_overlays_size)
+            self._overlay_renderer_size = renderer_size
+            self._overlay_size = (overlay_width, overlay_height)
+        return self._overlay_size
+
     @property
     def name(self) -> str:
         """Returns the name of the environment."""
@@ -480,6 +702,30 @@ class MjCambrianEnv(ParallelEnv, Env):
         """Returns the agents in the environment."""
         return self._agents
 
+    @property
+    def agent_indices(self) -> Dict[str, int]:
+        """Returns the index of each agent in `agent_positions`."""
+        return self._agent_indices
+
+    def agents_selected_mask(self, patterns: Optional[List[str]]) -> np.ndarray:
+        """Returns a read-only boolean mask over the agents (in the same order as
+        `agent_positions`) of which agents are selected by the patterns. See
+        `agent_selected`. The agents are fixed for the env, so the mask is only
+        computed once per set of patterns."""
+        key = None if patterns is None else tuple(patterns)
+        mask = self._agents_selected_masks.get(key)
+        if mask is None:
+            mask = agents_selected_mask(self._agent_names, patterns)
+            mask.flags.writeable = False
+            self._agents_selected_masks[key] = mask
+        return mask
+
+    @property
+    def agent_positions(self) -> np.ndarray:
+        """Returns the positions of all the agents as a (num_agents, 3) array. Updated
+        after each simulation step, so don't modify it."""
+        return self._agent_positions
+
     @property
     def renderer(self) -> MjCambrianRenderer:
         """Returns the renderer for the environment."""
@@ -546,9 +792,9 @@ class MjCambrianEnv(ParallelEnv, Env):
 
         Assumes that the possible agents are the same as the agents.
         """
-        return list(self._agents.keys())
+        return list(self._agent_names)
 
-    @property
+    @cached_property
     def observation_spaces(self) -> spaces.Dict:
         """Creates the observation spaces.
 
@@ -564,12 +810,11 @@ class MjCambrianEnv(ParallelEnv, Env):
 
         # Create the observation_spaces
         observation_spaces: Dict[str, spaces.Space] = {}
-        for name, agent in self._agents.items():
-            if agent.trainable:
-                observation_spaces[name] = agent.observation_space
+        for name, agent in self._trainable_items:
+            observation_spaces[name] = agent.observation_space
         return spaces.Dict(observation_spaces)
 
-    @property
+    @cached_property
     def action_spaces(self) -> spaces.Dict:
         """Creates the action spaces.
 
@@ -585,9 +830,8 @@ class MjCambrianEnv(ParallelEnv, Env):
 
         # Create the action_spaces
         action_spaces: Dict[str, spaces.Space] = {}
-        for name, agent in self._agents.items():
-            if agent.trainable:
-                action_spaces[name] = agent.action_space
+        for name, agent in self._trainable_items:
+            action_spaces[name] = agent.action_space
         return spaces.Dict(action_spaces)
 
     def observation_space(self, agent: str) -> spaces.Space:
@@ -595,20 +839,22 @@ class MjCambrianEnv(ParallelEnv, Env):
 
         This is part of the PettingZoo API.
         """
-        assert agent in list(
-            self.observation_spaces.keys()
-        ), f"Agent {agent} not found. Available: {list(self.observation_spaces.keys())}"
-        return self.observation_spaces[agent]
+        observation_spaces = self.observation_spaces
+        assert (
+            agent in observation_spaces.keys()
+        ), f"Agent {agent} not found. Available: {list(observation_spaces.keys())}"
+        return observation_spaces[agent]
 
     def action_space(self, agent: str) -> spaces.Space:
         """Returns the action space for the given agent.
 
         This is part of the PettingZoo API.
         """
-        assert agent in list(
-            self.action_spaces.keys()
-        ), f"Agent {agent} not found. Available: {list(self.action_spaces.keys())}"
-        return self.action_spaces[agent]
+        action_spaces = self.action_spaces
+        assert (
+            agent in action_spaces.keys()
+        ), f"Agent {agent} not found. Available: {list(action_spaces.keys())}"
+        return action_spaces[agent]
 
     def state(self) -> np.ndarray:
         """Returns the state of the environment.
@@ -619,11 +865,12 @@ class MjCambrianEnv(ParallelEnv, Env):
 
     def set_random_seed(self, seed: int | float | None):
         """Sets the seed for the environment."""
-        from stable_baselines3.common.utils import set_random_seed
-
         if seed is None:
             return
 
+        # Imported lazily since sb3 is only needed when a seed is actually set
+        from stable_baselines3.common.utils import set_random_seed
+
         get_logger().info(f"Setting random seed to {seed}")
         set_random_seed(seed)
 
@@ -642,7 +889,7 @@ class MjCambrianEnv(ParallelEnv, Env):
         if save_pkl:
             get_logger().info(f"Saving rollout to {path.with_suffix('.pkl')}")
             with open(path.with_suffix(".pkl"), "wb") as f:
-                pickle.dump(self._rollout, f)
+                pickle.dump(self._rollout, f, protocol=pickle.HIGHEST_PROTOCOL)
             get_logger().debug(f"Saved rollout to {path.with_suffix('.pkl')}")
 
     def close(self):
@@ -682,11 +929,17 @@ if __name__ == "__main__":
         env.reset(seed=config.seed)
         env.spec.save(config.expdir / "env.xml")
 
-        action = {name: [-1.0, -0.0] for name, a in env.agents.items() if a.trainable}
-        env.step(action.copy())
+        # The key callbacks update the action arrays in place. step writes the
+        # privileged agents' actions into the dict it's passed, so it's still given a
+        # shallow copy each step.
+        action = {
+            name: np.array([-1.0, -0.0], dtype=np.float32)
+            for name, a in env.agents.items()
+            if a.trainable
+        }
+        env.step(dict(action))
 
         if "human" in config.env.renderer.render_modes:
-            import glfw
 
             def custom_key_callback(_, key, *args, **__):
                 if key == glfw.KEY_R:
@@ -718,15 +971,10 @@ if __name__ == "__main__":
                 break
 
             if not no_step:
-                env.step(action.copy())
+                env.step(dict(action))
 
             env.render()
 
-            if record:
-                for name, agent in env.agents.items():
-                    if not agent.trainable:
-                        continue
-
         if record:
             env.save(
                 config.expdir / "eval",
@@ -1,10 +1,12 @@
 """Defines the MjCambrianMazeEnv class."""
 
 from enum import Enum
+from functools import lru_cache
 from typing import (
     Any,
     Callable,
     Concatenate,
+    Deque,
     Dict,
     List,
     Optional,
@@ -13,12 +15,13 @@ from typing import (
     TypeAlias,
 )
 
+import mujoco as mj
 import numpy as np
+import yaml
 from hydra_config import HydraContainerConfig, config_wrapper
 
 from cambrian.agents.agent import MjCambrianAgent
 from cambrian.envs.env import MjCambrianEnv, MjCambrianEnvConfig
-from cambrian.utils import safe_index
 from cambrian.utils.cambrian_xml import MjCambrianXML
 from cambrian.utils.spec import MjCambrianSpec
 
@@ -42,9 +45,11 @@ class MjCambrianMapEntity(Enum):
     EMPTY = "0"
 
     @staticmethod
+    @lru_cache(maxsize=1024)
     def parse(value: str) -> Tuple[Self, str]:
         """
-        Parse a value to handle special formats like "1:<texture id>".
+        Parse a value to handle special formats like "1:<texture id>". The results
+        are cached since a map only has a handful of unique cell values.
 
         Args:
             value (str): The value to parse.
@@ -118,6 +123,12 @@ class MjCambrianMazeConfig(HydraContainerConfig):
     enabled: bool
 
 
+def _default_rng() -> np.random.Generator:
+    """Returns a new generator seeded from the global np.random state, so that code
+    which seeds np.random still gets reproducible mazes."""
+    return np.random.default_rng(np.random.randint(2**31))
+
+
 MjCambrianMazeSelectionFn: TypeAlias = Callable[
     Concatenate[MjCambrianAgent, Dict[str, Any], ...], float
 ]
@@ -139,6 +150,16 @@ class MjCambrianMazeEnvConfig(MjCambrianEnvConfig):
 
 
 class MjCambrianMazeEnv(MjCambrianEnv):
+    """An env which places the agents in one of several mazes.
+
+    Note:
+        The maze selection, reset positions, and wall textures are drawn from a
+        generator owned by the maze store rather than from the global `np.random`
+        state. The generator is seeded from `np.random` when the env is created, so
+        seeding globally beforehand is still reproducible, and `set_random_seed`
+        (or `reset(seed=...)`) reseeds it directly.
+    """
+
     def __init__(self, config: MjCambrianMazeEnvConfig, **kwargs):
         self._config = config
 
@@ -194,6 +215,13 @@ class MjCambrianMazeEnv(MjCambrianEnv):
 
         return obs, info
 
+    def set_random_seed(self, seed: int | float | None):
+        """Also seeds the maze store, which doesn't use the global np.random. Float
+        seeds are truncated to an int for the store."""
+        super().set_random_seed(seed)
+        if seed is not None:
+            self._maze_store.set_random_seed(seed)
+
     # ==================
 
     @property
@@ -219,20 +247,33 @@ class MjCambrianMaze:
     """The maze class. Generates a maze from a given map and provides utility
     functions for working with the maze."""
 
-    def __init__(self, config: MjCambrianMazeConfig, name: str):
+    def __init__(
+        self,
+        config: MjCambrianMazeConfig,
+        name: str,
+        *,
+        rng: Optional[np.random.Generator] = None,
+    ):
         self._config = config
         self._name = name
         self._starting_x = None
+        self._rng = rng if rng is not None else _default_rng()
 
         self._map: np.ndarray = None
         self._load_map()
 
         self._wall_textures: List[str] = []
-        self._wall_locations: List[np.ndarray] = []
-        self._reset_locations: List[np.ndarray] = []
+        self._wall_locations: np.ndarray = np.zeros((0, 2))
+        self._reset_locations: np.ndarray = np.zeros((0, 2))
         self._reset_agents: List[str] = []
-        self._occupied_locations: List[np.ndarray] = []
+        # The occupied locations are stored in a single (capacity, 2) array which is
+        # grown by doubling. Only the first _num_occupied rows are valid.
+        self._occupied_locations: np.ndarray = np.empty((8, 2), dtype=np.float64)
+        self._num_occupied: int = 0
         self._agent_locations: Dict[str, int] = {}
+        self._agent_reset_locations: Dict[str, List[Tuple[float, float]]] = {}
+        self._wall_geoms: List[mj.MjsGeom] = []
+        self._wall_geoms_spec: MjCambrianSpec = None
 
         self._agent_id_map = dict(**self._config.agent_id_map)
 
@@ -242,10 +283,10 @@ class MjCambrianMaze:
 
     def _load_map(self):
         """Parses the map (which is a str) as a yaml str and converts it to an
-        np array."""
-        import yaml
-
-        self._map = np.array(yaml.safe_load(self._config.map), dtype=str)
+        np array. Uses the libyaml loader when it's available since it's much faster
+        than the pure python one."""
+        Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        self._map = np.array(yaml.load(self._config.map, Loader=Loader), dtype=str)
         if self._config.hflip:
             self._map = np.flip(self._map, axis=0)
         if self._config.vflip:
@@ -255,36 +296,47 @@ class MjCambrianMaze:
     def _update_locations(self):
         """This helper method will update the initially place the wall and reset
         locations. These are known at construction time. It will also parse wall
-        textures."""
-
-        for i in range(self._map.shape[0]):
-            for j in range(self._map.shape[1]):
-                struct = self._map[i][j]
-
-                # Calculate the cell location in global coords
-                x = (j + 0.5) * self._config.scale - self.x_map_center
-                y = self.y_map_center - (i + 0.5) * self._config.scale
-                loc = np.array([x, y])
-
-                entity, entity_id = MjCambrianMapEntity.parse(struct)
-                if entity == MjCambrianMapEntity.WALL:
-                    self._wall_locations.append(loc)
-
-                    # Do a check for the texture
-                    assert entity_id in self._config.wall_texture_map, (
-                        f"Invalid texture: {entity_id}. "
-                        f"Available textures: {list(self._config.wall_texture_map.keys())}"  # noqa
-                    )
-                    self._wall_textures.append(entity_id)
-                elif entity == MjCambrianMapEntity.RESET:
-                    self._reset_locations.append(loc)
-
-                    # Do a check for the agent id
-                    assert entity_id in list(self._agent_id_map.keys()), (
-                        f"Invalid agent id: {entity_id}. "
-                        f"Available agent ids: {list(self._agent_id_map.keys())}"
-                    )
-                    self._reset_agents.append(entity_id)
+        textures.
+
+        The whole map is parsed at once, where each cell is split into its entity and
+        (optional) id. See `MjCambrianMapEntity.parse` for the format."""
+
+        # Split each cell into the entity and the entity id (i.e. "1:<texture id>")
+        entities, sep, entity_ids = np.moveaxis(
+            np.char.partition(self._map, ":"), -1, 0
+        )
+        entity_ids = np.where(sep == ":", entity_ids, DEFAULT_ENTITY_ID)
+
+        # Only walls and resets can have ids
+        is_wall = entities == MjCambrianMapEntity.WALL.value
+        is_reset = entities == MjCambrianMapEntity.RESET.value
+        is_empty = self._map == MjCambrianMapEntity.EMPTY.value
+        is_unknown = ~(is_wall | is_reset | is_empty)
+        if np.any(is_unknown):
+            raise ValueError(f"Unknown MjCambrianMapEntity: {self._map[is_unknown][0]}")
+
+        # Calculate the cell locations in global coords
+        i, j = np.indices(self._map.shape)
+        x = (j + 0.5) * self._config.scale - self.x_map_center
+        y = self.y_map_center - (i + 0.5) * self._config.scale
+        locations = np.stack([x, y], axis=-1)
+
+        self._wall_locations = locations[is_wall]
+        self._wall_textures = entity_ids[is_wall].tolist()
+        self._reset_locations = locations[is_reset]
+        self._reset_agents = entity_ids[is_reset].tolist()
+
+        # Do a check for the textures and agent ids
+        for entity_id in set(self._wall_textures):
+            assert entity_id in self._config.wall_texture_map, (
+                f"Invalid texture: {entity_id}. "
+                f"Available textures: {list(self._config.wall_texture_map.keys())}"
+            )
+        for entity_id in set(self._reset_agents):
+            assert entity_id in self._agent_id_map, (
+                f"Invalid agent id: {entity_id}. "
+                f"Available agent ids: {list(self._agent_id_map.keys())}"
+            )
 
     def generate_xml(self) -> MjCambrianXML:
         xml = MjCambrianXML.from_string(self._config.xml)
@@ -346,7 +398,7 @@ class MjCambrianMaze:
         """Resets the maze. Will reset the wall textures and reset the occupied
         locations, if desired."""
         if reset_occupied:
-            self._occupied_locations.clear()
+            self._num_occupied = 0
             self._agent_locations.clear()
 
         self._reset_wall_textures(spec)
@@ -362,19 +414,32 @@ class MjCambrianMaze:
         texture_map: Dict[str, str] = {}
         for t in self._wall_textures:
             if t not in texture_map:
-                texture_map[t] = np.random.choice(
+                texture_map[t] = self._rng.choice(
                     list(self._config.wall_texture_map[t])
                 )
 
         # Now, update the wall textures
-        for i, t in zip(range(len(self._wall_locations)), self._wall_textures):
-            wall_name = f"wall_{self._name}_{i}"
-            geom_id = spec.get_geom_id(wall_name)
-            assert geom_id != -1, f"`{wall_name}` geom not found"
-
-            # Update the geom material
-            material_name = f"wall_{self._name}_{t}_{texture_map[t]}_mat"
-            spec.geoms[geom_id].material = material_name
+        material_map = {
+            t: f"wall_{self._name}_{t}_{texture}_mat"
+            for t, texture in texture_map.items()
+        }
+        for geom, t in zip(self._get_wall_geoms(spec), self._wall_textures):
+            geom.material = material_map[t]
+
+    def _get_wall_geoms(self, spec: MjCambrianSpec) -> List[mj.MjsGeom]:
+        """Returns the spec geom of each wall. `spec.geoms` builds a new list of all the
+        geoms each time it's accessed, so the wall geoms are looked up once per spec
+        rather than on every reset."""
+        if self._wall_geoms_spec is not spec:
+            geoms = spec.geoms
+            self._wall_geoms = []
+            for i in range(len(self._wall_locations)):
+                wall_name = f"wall_{self._name}_{i}"
+                geom_id = spec.get_geom_id(wall_name)
+                assert geom_id != -1, f"`{wall_name}` geom not found"
+                self._wall_geoms.append(geoms[geom_id])
+            self._wall_geoms_spec = spec
+        return self._wall_geoms
 
     # ==================
 
@@ -405,8 +470,6 @@ class MjCambrianMaze:
                 obstacle is a tuple of (row, col). Defaults to []. Avoids these
                 positions when computing the path.
         """
-        from typing import Deque
-
         start = self.xy_to_rowcol(start)
         target = self.xy_to_rowcol(target)
 
@@ -474,19 +537,21 @@ class MjCambrianMaze:
         """
         assert len(locations) > 0, "Not enough locations to choose from"
 
+        # Compare squared distances against the squared threshold to avoid the sqrt.
+        # The occupied locations are checked all at once for each candidate.
+        threshold_sq = (0.5 * self._config.scale) ** 2
+        occupied = self.occupied_locations
         for _ in range(tries):
-            idx = np.random.randint(low=0, high=len(locations))
-            pos = locations[idx].copy()
+            idx = self._rng.integers(low=0, high=len(locations))
+            pos = np.array(locations[idx], dtype=float)
 
             # Check if the position is already occupied
-            for occupied in self._occupied_locations:
-                if np.linalg.norm(pos - occupied) <= 0.5 * self._config.scale:
-                    break
-            else:
+            delta = occupied - pos
+            if not np.any(np.einsum("ij,ij->i", delta, delta) <= threshold_sq):
                 return pos
         raise ValueError(
             f"Could not generate a unique position. {tries} tries failed. "
-            f"Occupied locations: {self._occupied_locations}. "
+            f"Occupied locations: {occupied.tolist()}. "
             f"Available locations: {locations}."
         )
 
@@ -502,28 +567,45 @@ class MjCambrianMaze:
         Returns:
             np.ndarray: The chosen position. Is of size (2,).
         """
-        reset_locations = []
-        for reset_agent, reset_pos in zip(self._reset_agents, self._reset_locations):
-            if agent in self._agent_id_map[reset_agent]:
-                reset_locations.append(reset_pos)
-        reset_locations = np.array(reset_locations)
+        # The reset locations of each agent are fixed, so they're only filtered once
+        if (reset_locations := self._agent_reset_locations.get(agent)) is None:
+            reset_locations = [
+                tuple(reset_pos)
+                for reset_agent, reset_pos in zip(
+                    self._reset_agents, self._reset_locations
+                )
+                if agent in self._agent_id_map[reset_agent]
+            ]
+            self._agent_reset_locations[agent] = reset_locations
         if len(reset_locations) == 0:
             raise ValueError(f"No reset locations found for agent '{agent}'.")
 
         # Reset the occupied location if the agent is already in the occupied locations
         if agent in self._agent_locations:
-            del self._occupied_locations[self._agent_locations[agent]]
+            idx, n = self._agent_locations[agent], self._num_occupied
+            occupied = self._occupied_locations
+            occupied[idx : n - 1] = occupied[idx + 1 : n]
+            self._num_occupied -= 1
 
         # Generate the pos and assign that pos to the agent
-        reset_locations = [tuple(loc) for loc in reset_locations]
-        occupied_locations = [tuple(loc) for loc in self._occupied_locations]
-        possible_locations = list(set(reset_locations) - set(occupied_locations))
-        pos = possible_locations[np.random.choice(len(possible_locations))]
+        occupied_locations = set(map(tuple, self.occupied_locations.tolist()))
+        possible_locations = list(set(reset_locations) - occupied_locations)
+        pos = possible_locations[self._rng.integers(len(possible_locations))]
         if add_as_occupied:
-            self._agent_locations[agent] = len(self._occupied_locations)
-            self._occupied_locations.append(pos)
+            self._agent_locations[agent] = self._num_occupied
+            self._add_occupied_location(pos)
         return pos
 
+    def _add_occupied_location(self, pos: Tuple[float, float]):
+        """Appends a location to the occupied locations, doubling the capacity of the
+        array if it's full."""
+        if self._num_occupied == len(self._occupied_locations):
+            grown = np.empty((2 * self._num_occupied, 2), dtype=np.float64)
+            grown[: self._num_occupied] = self._occupied_locations
+            self._occupied_locations = grown
+        self._occupied_locations[self._num_occupied] = pos
+        self._num_occupied += 1
+
     # ==================
 
     @property
@@ -586,10 +668,15 @@ class MjCambrianMaze:
         return np.array([-self._starting_x + len(self._map[0]) / 4, 0, 0])
 
     @property
-    def reset_locations(self) -> List[np.ndarray]:
-        """Returns the reset locations."""
+    def reset_locations(self) -> np.ndarray:
+        """Returns the reset locations as a (N, 2) array."""
         return self._reset_locations
 
+    @property
+    def occupied_locations(self) -> np.ndarray:
+        """Returns a view of the occupied locations as a (K, 2) array."""
+        return self._occupied_locations[: self._num_occupied]
+
 
 # ================================
 
@@ -602,12 +689,30 @@ class MjCambrianMazeStore:
         maze_configs: Dict[str, MjCambrianMazeEnvConfig],
         maze_selection_fn: MjCambrianMazeSelectionFn,
     ):
+        # The mazes share the store's generator rather than the global np.random
+        # state. It's reseeded in place by set_random_seed, so the mazes never need
+        # to be handed a new generator.
+        self._rng = _default_rng()
+
         self._mazes: Dict[str, MjCambrianMaze] = {}
         self._create_mazes(maze_configs)
 
+        # The mazes are fixed after creation, so keep their order and each maze's index
+        # in it for the selection methods
+        self._maze_list: List[MjCambrianMaze] = list(self._mazes.values())
+        self._maze_indices: Dict[str, int] = {
+            name: i for i, name in enumerate(self._mazes)
+        }
+
         self._current_maze: MjCambrianMaze = None
         self._maze_selection_fn = maze_selection_fn
 
+        # The scheduled selection probabilities only depend on lambda, so memoize them
+        # on the quantized lambda. Wrapped per instance (rather than decorating the
+        # method) so the cache is freed with the store.
+        self._maze_idx_arange = np.arange(len(self._maze_list))
+        self._schedule_probs = lru_cache(maxsize=256)(self._compute_schedule_probs)
+
     def _create_mazes(self, maze_configs: Dict[str, MjCambrianMazeEnvConfig]):
         prev_x, prev_width = 0, 0
         for name, config in maze_configs.items():
@@ -619,7 +724,7 @@ class MjCambrianMazeStore:
                 continue
 
             # First create the maze
-            maze = MjCambrianMaze(config, name)
+            maze = MjCambrianMaze(config, name, rng=self._rng)
             self._mazes[name] = maze
 
             # Calculate the starting x of the maze
@@ -647,6 +752,11 @@ class MjCambrianMazeStore:
         for maze in self._mazes.values():
             maze.reset(spec)
 
+    def set_random_seed(self, seed: int | float):
+        """Seeds the generator used by the store and its mazes. The seed is cast to
+        an int since the generator doesn't accept floats."""
+        self._rng.bit_generator.state = np.random.PCG64(int(seed)).state
+
     @property
     def current_maze(self) -> MjCambrianMaze:
         """Returns the current maze."""
@@ -655,7 +765,7 @@ class MjCambrianMazeStore:
     @property
     def maze_list(self) -> List[MjCambrianMaze]:
         """Returns the list of mazes."""
-        return list(self._mazes.values())
+        return list(self._maze_list)
 
     # ======================
     # Maze selection methods
@@ -668,7 +778,7 @@ class MjCambrianMazeStore:
 
     def select_maze_random(self, _: "MjCambrianEnv") -> MjCambrianMaze:
         """Selects a maze at random."""
-        return np.random.choice(self.maze_list)
+        return self._rng.choice(self._maze_list)
 
     def select_maze_schedule(
         self,
@@ -713,10 +823,18 @@ class MjCambrianMazeStore:
         else:
             raise ValueError(f"Invalid schedule: {schedule}")
 
-        p = np.exp(lam * np.arange(len(self.maze_list)))
-        return np.random.choice(self.maze_list, p=p / p.sum())
+        p = self._schedule_probs(round(lam * 10000))
+        return self._rng.choice(self._maze_list, p=p)
+
+    def _compute_schedule_probs(self, lam_q: int) -> np.ndarray:
+        """Computes the scheduled selection probabilities for a lambda quantized to
+        4 decimals."""
+        p = np.exp((lam_q / 10000) * self._maze_idx_arange)
+        return p / p.sum()
 
     def select_maze_cycle(self, env: "MjCambrianEnv") -> MjCambrianMaze:
         """Selects a maze based on a cycle."""
-        idx = safe_index(self.maze_list, self._current_maze, default=-1)
-        return self.maze_list[(idx + 1) % len(self.maze_list)]
+        idx = -1
+        if self._current_maze is not None:
+            idx = self._maze_indices.get(self._current_maze.name, -1)
+        return self._maze_list[(idx + 1) % len(self._maze_list)]
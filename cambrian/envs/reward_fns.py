@@ -1,5 +1,6 @@
 """Reward fns. These can be used to calculate rewards for agents."""
 
+import math
 from typing import Any, Callable, Dict, List, Optional
 
 import gymnasium as gym
@@ -23,8 +24,11 @@ def calc_delta(
             (i.e. current - prev).
     """
 
-    current_distance = np.linalg.norm(agent.pos - point)
-    prev_distance = np.linalg.norm(info["prev_pos"] - point)
+    # The positions are only 3 elements, so computing the distances on python floats
+    # is much cheaper than subtracting the arrays and calling np.linalg.norm
+    point = np.asarray(point).tolist()
+    current_distance = math.dist(agent.pos.tolist(), point)
+    prev_distance = math.dist(info["prev_pos"].tolist(), point)
     return current_distance - prev_distance
 
 
@@ -95,13 +99,13 @@ def reward_fn_done(
             truncated. Defaults to 0.
     """
 
+    # Most steps are neither terminated nor truncated, and the reward is always 0
+    # then, so skip building the closure
+    if not (terminated or truncated):
+        return 0.0
+
     def calc_reward():
-        reward = 0.0
-        if terminated:
-            reward += termination_reward
-        if truncated:
-            reward += truncation_reward
-        return reward
+        return termination_reward * terminated + truncation_reward * truncated
 
     return apply_reward_fn(
         env,
@@ -147,17 +151,16 @@ def reward_fn_euclidean_delta_to_agent(
     """
 
     def calc_deltas() -> float:
-        accumulated_reward = 0.0
-        for other_agent in env.agents.values():
-            if not agent_selected(other_agent, to_agents):
-                continue
-
-            # NOTE: calc_delta returns a positive value if the agent moves away from the
-            # agent. We'll multiple by -1 to flip the convention.
-            delta = -reward * calc_delta(agent, info, other_agent.pos)
-            accumulated_reward = delta
+        # Only the delta to the last selected agent (in the order of `env.agents`)
+        # contributes to the reward, so find it with the cached selection mask rather
+        # than calling calc_delta for every selected agent.
+        indices = np.flatnonzero(env.agents_selected_mask(to_agents))
+        if len(indices) == 0:
+            return 0.0
 
-        return accumulated_reward
+        # NOTE: calc_delta returns a positive value if the agent moves away from the
+        # agent. We'll multiple by -1 to flip the convention.
+        return -reward * calc_delta(agent, info, env.agent_positions[indices[-1]])
 
     return apply_reward_fn(env, agent, reward_fn=calc_deltas, **kwargs)
 
@@ -210,20 +213,24 @@ def reward_fn_close_to_agent(
     """
 
     def calc_deltas():
-        accumulated_reward = 0
-        for agent_name, agent in env.agents.items():
-            if from_agents is not None and agent_name not in from_agents:
-                continue
-
-            for other_agent_name, other_agent in env.agents.items():
-                if to_agents is not None and other_agent_name not in to_agents:
-                    continue
-                if agent_name == other_agent_name:
-                    continue
-
-                if np.linalg.norm(agent.pos - other_agent.pos) < distance_threshold:
-                    accumulated_reward += reward
-        return accumulated_reward
+        from_idxs, to_idxs = [], []
+        for agent_name, idx in env.agent_indices.items():
+            if from_agents is None or agent_name in from_agents:
+                from_idxs.append(idx)
+            if to_agents is None or agent_name in to_agents:
+                to_idxs.append(idx)
+        if len(from_idxs) == 0 or len(to_idxs) == 0:
+            return 0
+
+        # Compute the squared distances between all the from/to pairs at once and
+        # compare against the squared threshold. Pairs of the same agent are ignored.
+        from_idxs, to_idxs = np.array(from_idxs), np.array(to_idxs)
+        positions = env.agent_positions
+        diff = positions[from_idxs, None] - positions[None, to_idxs]
+        distances_sq = np.einsum("ijk,ijk->ij", diff, diff)
+        is_close = distances_sq < distance_threshold**2
+        is_close &= from_idxs[:, None] != to_idxs[None, :]
+        return reward * int(np.count_nonzero(is_close))
 
     return apply_reward_fn(env, agent, reward_fn=calc_deltas, **kwargs)
 
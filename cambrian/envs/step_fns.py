@@ -42,22 +42,33 @@ def step_respawn_agents_if_close_to_agents(
         to_agents: List of agent names to check distance to
         from_agents: List of agent names to check distance from
     """
+    # These are invariant across the agents, so compute them once. The positions are
+    # copied so a respawned agent's new position can be used by the later checks.
+    distance_threshold_sq = distance_threshold**2
+    positions = env.agent_positions.copy()
+    to_idxs = np.array(
+        [
+            idx
+            for other_agent_name, idx in env.agent_indices.items()
+            if to_agents is None or other_agent_name in to_agents
+        ],
+        dtype=int,
+    )
+
     for agent_name, agent in env.agents.items():
         if for_agents is not None and agent_name not in for_agents:
             continue
         if from_agents is not None and agent_name not in from_agents:
             continue
 
-        for other_agent_name, other_agent in env.agents.items():
-            if to_agents is not None and other_agent_name not in to_agents:
-                continue
-            if agent_name == other_agent_name:
-                continue
-
-            info[agent_name]["respawned"] = False
-            if np.linalg.norm(agent.pos - other_agent.pos) < distance_threshold:
-                obs[agent_name] = respawn_agent(env, agent)
-                info[agent_name]["respawned"] = True
+        # Check the squared distances to all the other agents at once
+        info[agent_name]["respawned"] = False
+        idx = env.agent_indices[agent_name]
+        diff = positions[to_idxs[to_idxs != idx]] - positions[idx]
+        if np.any(np.einsum("ij,ij->i", diff, diff) < distance_threshold_sq):
+            obs[agent_name] = respawn_agent(env, agent)
+            info[agent_name]["respawned"] = True
+            positions[idx] = agent.pos
 
     return obs, info
 
@@ -2,6 +2,7 @@
 environment. The eye is essentially a camera that is attached to a body in the
 environment. The eye can render images and provide observations to the agent."""
 
+from functools import cached_property
 from typing import Callable, List, Optional, Self, Tuple
 from xml.etree.ElementTree import Element
 
@@ -278,7 +279,7 @@ class MjCambrianEye:
         """The name of the eye."""
         return self._name
 
-    @property
+    @cached_property
     def observation_space(self) -> spaces.Box:
         """Constructs the observation space for the eye. The observation space is a
         `spaces.Box` with the shape of the resolution of the eye."""
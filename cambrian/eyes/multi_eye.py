@@ -1,7 +1,8 @@
 """Defines a multi-eye system that procedurally generates multiple eyes and manages
 them."""
 
-from typing import Any, Callable, Dict, Self, Tuple
+from functools import cached_property
+from typing import Any, Callable, Dict, List, Self, Tuple
 
 import numpy as np
 import torch
@@ -10,7 +11,7 @@ from hydra_config import config_wrapper
 
 from cambrian.eyes.eye import MjCambrianEye, MjCambrianEyeConfig
 from cambrian.renderer.overlays import MjCambrianCursor, MjCambrianViewerOverlay
-from cambrian.renderer.render_utils import generate_composite
+from cambrian.renderer.render_utils import generate_composite_from_stack
 from cambrian.utils import MjCambrianGeometry, generate_sequence_from_range
 from cambrian.utils.cambrian_xml import MjCambrianXML
 from cambrian.utils.types import ObsType
@@ -88,6 +89,13 @@ class MjCambrianMultiEye(MjCambrianEye):
 
         # Generate eyes procedurally
         self._eyes: Dict[str, MjCambrianEye] = {}
+        self._eye_coords: Dict[str, Tuple[float, float]] = {}
+        self._composite_eyes: List[MjCambrianEye] = []
+        self._composite_shape: Tuple[int, int] = (0, 0)
+        self._composite_buffer: torch.Tensor = None
+        self._composite_text: List[str] = []
+        self._flat_obs: torch.Tensor = None
+        self._flatten_observations = bool(config.flatten_observations)
         self._place_eyes()
 
         super().__init__(config, name, disable_render=disable_render)
@@ -97,31 +105,77 @@ class MjCambrianMultiEye(MjCambrianEye):
         nlat, nlon = self._config.num_eyes
         lat_bins = generate_sequence_from_range(self._config.lat_range, nlat)
         lon_bins = generate_sequence_from_range(self._config.lon_range, nlon)
-        for lat_idx, lat in enumerate(lat_bins):
-            for lon_idx, lon in enumerate(lon_bins):
-                eye_name = f"{self._name}_{lat_idx}_{lon_idx}"
-                eye_config = self._config._single_eye.copy()
-                # Update the eye's coord to the current lat, lon
-                eye_config.coord = [lat, lon]
-                # Create the eye instance
-                eye = eye_config.instance(eye_config, eye_name)
-                self._eyes[eye_name] = eye
+        lats, lons = np.meshgrid(lat_bins, lon_bins, indexing="ij")
+        lat_idxs, lon_idxs = np.indices(lats.shape)
+
+        # Flatten the grid so each eye is created in a single pass
+        single_eye = self._config._single_eye
+        for lat_idx, lon_idx, lat, lon in zip(
+            lat_idxs.ravel().tolist(),
+            lon_idxs.ravel().tolist(),
+            lats.ravel().tolist(),
+            lons.ravel().tolist(),
+        ):
+            eye_name = f"{self._name}_{lat_idx}_{lon_idx}"
+            eye_config = single_eye.copy()
+            # Update the eye's coord to the current lat, lon
+            eye_config.coord = [lat, lon]
+            # Create the eye instance
+            eye = eye_config.instance(eye_config, eye_name)
+            self._eyes[eye_name] = eye
+            self._eye_coords[eye_name] = (lat, lon)
+
+        # The eyes are fixed after placement, so cache the items for stepping
+        self._eye_items: Tuple[Tuple[str, MjCambrianEye], ...] = tuple(
+            self._eyes.items()
+        )
+        self._create_composite_layout()
+
+    def _create_composite_layout(self):
+        """Precomputes the order of the eyes in the composite image used by `render`.
+        The layout is fixed once the eyes are placed, so there's no need to sort the
+        eyes by their lat/lon on every render."""
+        eyes_by_coord: Dict[float, Dict[float, MjCambrianEye]] = {}
+        for name, eye in self._eyes.items():
+            lat, lon = self._eye_coords[name]
+            eyes_by_coord.setdefault(lat, {})
+            assert lon not in eyes_by_coord[lat], f"Duplicate eye at {lat}, {lon}."
+            eyes_by_coord[lat][lon] = eye
+
+        self._composite_eyes = [
+            eyes_by_coord[lat][lon]
+            for lat in sorted(eyes_by_coord.keys())
+            for lon in sorted(eyes_by_coord[lat].keys())[::-1]
+        ]
+        if len(eyes_by_coord) > 0:
+            nrows = len(eyes_by_coord)
+            self._composite_shape = (nrows, len(self._composite_eyes) // nrows)
+
+        # The debug text is also fixed, so build it once instead of reading the config
+        # on every render
+        self._composite_text = [
+            f"Num Eyes: {self.num_eyes}",
+            f"FOV: {self._config.fov}",
+            f"Resolution: {self._config.resolution}",
+        ]
 
     def generate_xml(
         self, parent_xml: MjCambrianXML, geom: MjCambrianGeometry, parent_body_name: str
     ) -> MjCambrianXML:
         """Generate the XML for all eyes."""
         xml = super().generate_xml(parent_xml, geom, parent_body_name)
-        for eye in self._eyes.values():
-            eye_xml = eye.generate_xml(parent_xml, geom, parent_body_name)
-            xml += eye_xml
+        xml.extend(
+            [
+                eye.generate_xml(parent_xml, geom, parent_body_name)
+                for eye in self._eyes.values()
+            ]
+        )
         return xml
 
     def reset(self, *args) -> ObsType:
         """Reset all eyes."""
-        obs = {}
-        for name, eye in self._eyes.items():
-            obs[name] = eye.reset(*args)
+        obs = {name: eye.reset(*args) for name, eye in self._eye_items}
+        self._flat_obs = None
 
         super().reset(*args)
 
@@ -130,15 +184,19 @@ class MjCambrianMultiEye(MjCambrianEye):
     def step(self, obs: ObsType | None = None) -> ObsType:
         """Step all eyes and collect observations."""
         if obs is None:
-            obs = {}
-            for name, eye in self._eyes.items():
-                obs[name] = eye.step()
+            obs = {name: eye.step() for name, eye in self._eye_items}
         return self._update_obs(obs)
 
     def _update_obs(self, obs: ObsType) -> ObsType:
-        """Update the observation space."""
-        if self._config.flatten_observations:
-            obs = torch.cat(list(obs.values()), dim=0)
+        """Update the observation space. If the observations are flattened, the eye
+        observations are concatenated into a single buffer which is reused across
+        steps (similar to the single eye's `prev_obs`)."""
+        if self._flatten_observations:
+            if self._flat_obs is None:
+                self._flat_obs = torch.cat(list(obs.values()), dim=0)
+            else:
+                torch.cat(list(obs.values()), dim=0, out=self._flat_obs)
+            obs = self._flat_obs
         return obs
 
     def render(self) -> list[MjCambrianViewerOverlay]:
@@ -156,28 +214,26 @@ class MjCambrianMultiEye(MjCambrianEye):
 
         overlays = []
 
-        # Sort the eyes based on their lat/lon
-        images: Dict[float, Dict[float, torch.Tensor]] = {}
-        for eye in self.eyes.values():
-            lat, lon = eye.config.coord
-            if lat not in images:
-                images[lat] = {}
-            assert lon not in images[lat], f"Duplicate eye at {lat}, {lon}."
-
-            # Add the image to the dictionary
-            images[lat][lon] = eye.prev_obs
+        # Stack the images into the reused buffer in the precomputed layout order
+        images = [eye.prev_obs for eye in self._composite_eyes]
+        buffer = self._composite_buffer
+        if buffer is None or buffer.shape[1:] != images[0].shape:
+            self._composite_buffer = torch.stack(images)
+        else:
+            torch.stack(images, out=buffer)
 
         # Add text overlays
         create_text_overlay = MjCambrianViewerOverlay.create_text_overlay
-        overlays.append(create_text_overlay(f"Num Eyes: {self.num_eyes}"))
-        overlays.append(create_text_overlay(f"FOV: {self.config.fov}"))
-        overlays.append(create_text_overlay(f"Resolution: {self.config.resolution}"))
+        overlays.extend(create_text_overlay(text) for text in self._composite_text)
 
         # Add image overlays
         position = MjCambrianCursor.Position.BOTTOM_LEFT
         layer = MjCambrianCursor.Layer.BACK
         cursor = MjCambrianCursor(position=position, x=0, y=0, layer=layer)
-        image = generate_composite(images) * 255.0
+        image = generate_composite_from_stack(
+            self._composite_buffer, *self._composite_shape
+        )
+        image *= 255.0
         image_overlay = MjCambrianViewerOverlay.create_image_overlay(
             image, cursor=cursor
         )
@@ -185,7 +241,7 @@ class MjCambrianMultiEye(MjCambrianEye):
 
         return overlays
 
-    @property
+    @cached_property
     def observation_space(self) -> spaces.Space:
         """Constructs the observation space for the multi-eye."""
         if self._config.flatten_observations:
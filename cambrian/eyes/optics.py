@@ -250,6 +250,13 @@ class MjCambrianOpticsEye(MjCambrianEye):
         self._height_map = height_map.to(device)
         self._psf_resolution = psf_resolution
 
+        # These only depend on the config and are read every step, so compute them
+        # once instead of going through the config each time
+        self._min_depth = 5 * max(fx, fy)
+        self._noise_std = self._config.noise_std
+        self._scale_intensity = self._config.scale_intensity
+        self._crop_resolution = tuple(self._config.resolution)
+
         # Precompute the PSFs, if necessary
         if self._config.depths:
             self._precompute_psfs()
@@ -297,11 +304,11 @@ class MjCambrianOpticsEye(MjCambrianEye):
         # Calculate the depth. Remove the sky depth, which is capped at the extent
         # of the configured environment and apply a far field approximation assumption.
         depth = depth[depth < torch.max(depth)]
-        depth = torch.clamp(depth, 5 * max(self.config.focal), None)
+        depth = torch.clamp(depth, self._min_depth, None)
         mean_depth = torch.mean(depth)
 
         # Add noise to the image
-        image = self._apply_noise(image, self._config.noise_std)
+        image = self._apply_noise(image, self._noise_std)
 
         # Apply the depth invariant PSF
         psf = self._get_psf(mean_depth)
@@ -312,7 +319,7 @@ class MjCambrianOpticsEye(MjCambrianEye):
         image = torch.nn.functional.conv2d(image, psf, padding="same", groups=3)
 
         # Apply the scaling intensity ratio
-        if self._config.scale_intensity:
+        if self._scale_intensity:
             image *= self._scaling_intensity
 
         # Post-process the image
@@ -345,7 +352,7 @@ class MjCambrianOpticsEye(MjCambrianEye):
         supports input shape [W, H, 3]. It crops the center part of the image.
         """
         width, height, _ = image.shape
-        target_width, target_height = self._config.resolution
+        target_width, target_height = self._crop_resolution
         top = (height - target_height) // 2
         left = (width - target_width) // 2
         return image[left : left + target_width, top : top + target_height, :]
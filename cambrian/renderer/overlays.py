@@ -180,7 +180,10 @@ class MjCambrianImageViewerOverlay(MjCambrianViewerOverlay):
 
     def __init__(self, obj: torch.Tensor, cursor: Optional[MjCambrianCursor] = None):
         super().__init__(obj, cursor)
-        self._obj_cpu = obj.cpu()
+
+        # mjr_drawPixels expects uint8 pixels, so the image is cast while it's copied
+        # to the cpu rather than having the float array converted on each draw.
+        self._obj_cpu = torch.empty(obj.shape, dtype=torch.uint8)
 
     def draw_after_render(self, mjr_context: mj.MjrContext, viewport: mj.MjrRect):
         assert self._cursor is not None
@@ -198,7 +201,7 @@ class MjCambrianImageViewerOverlay(MjCambrianViewerOverlay):
         self._obj = resize_with_aspect_fill(
             self._obj, cursor.container_height, cursor.container_width
         )
-        self._obj_cpu = self._obj.cpu()
+        self._obj_cpu = torch.empty(self._obj.shape, dtype=torch.uint8)
 
         # Adjust the cursor position
         self._cursor.x = cursor.x
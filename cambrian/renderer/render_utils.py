@@ -1,8 +1,10 @@
 """Rendering utilities."""
 
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
 
 import mujoco as mj
+import numpy as np
 import torch
 import torch.nn.functional as F
 
@@ -28,9 +30,24 @@ def resize_with_aspect_fill(
     images: torch.Tensor,
     height: int,
     width: int,
+    *,
+    out: Optional[torch.Tensor] = None,
 ) -> torch.Tensor:
     """Resize the image while maintaining the aspect ratio and
-    filling the rest with black."""
+    filling the rest with black.
+
+    The images are permuted to channels-first once, resized and padded along whichever
+    axis doesn't fill the target, and then permuted back into a single contiguous
+    tensor. This avoids returning a strided view which has to be copied again
+    downstream (i.e. when drawn or recorded).
+
+    Keyword Args:
+        out (Optional[torch.Tensor]): If passed, the resized images are written
+            directly into this tensor (which may be a strided view) and it's returned
+            instead. Only the padded border is zeroed, so no padded intermediate is
+            allocated. Must be of shape (..., height, width, C) and hold the same
+            number of images.
+    """
     squeeze = False
     if images.ndim == 3:
         squeeze = True
@@ -40,30 +57,44 @@ def resize_with_aspect_fill(
     ratio_original = original_width / original_height
     ratio_new = width / height
 
-    transpose = False
     if ratio_original < ratio_new:
-        # Transpose for taller images
-        transpose = True
-        images = images.permute(0, 2, 1, 3)
-        height, width = width, height
-        ratio_new = width / height
-        ratio_original = original_height / original_width
+        # Taller images fill the height and are padded on the left and right
+        resize_height = height
+        resize_width = max(1, round(height * ratio_original))
+    else:
+        # Wider images fill the width and are padded on the top and bottom
+        resize_height = max(1, round(width / ratio_original))
+        resize_width = width
 
-    resize_height = max(1, round(width / ratio_original))
-    resized_images = resize(images, resize_height, width)
+    resized_images = F.interpolate(
+        images.permute(0, 3, 1, 2),
+        size=(resize_height, resize_width),
+        mode="nearest",
+        align_corners=None,
+    )
 
     pad_top = (height - resize_height) // 2
     pad_bottom = height - resize_height - pad_top
+    pad_left = (width - resize_width) // 2
+    pad_right = width - resize_width - pad_left
+
+    if out is not None:
+        bottom, right = pad_top + resize_height, pad_left + resize_width
+        region = out[..., pad_top:bottom, pad_left:right, :]
+        region.copy_(resized_images.permute(0, 2, 3, 1).reshape(region.shape))
+        out[..., :pad_top, :, :] = 0
+        out[..., bottom:, :, :] = 0
+        out[..., :pad_left, :] = 0
+        out[..., right:, :] = 0
+        return out
+
     padded_images = F.pad(
-        resized_images.permute(0, 3, 1, 2),
-        (0, 0, pad_top, pad_bottom),
+        resized_images,
+        (pad_left, pad_right, pad_top, pad_bottom),
         mode="constant",
         value=0,
-    ).permute(0, 2, 3, 1)
-
-    if transpose:
-        # Transpose back
-        padded_images = padded_images.permute(0, 2, 1, 3)
+    )
+    padded_images = padded_images.permute(0, 2, 3, 1).contiguous()
 
     return padded_images.squeeze(0) if squeeze else padded_images
 
@@ -109,26 +140,59 @@ def generate_composite(images: Dict[float, Dict[float, torch.Tensor]]) -> torch.
             for lon in sorted(images[lat].keys())[::-1]
         ]
     )
-    _, H, W, _ = composite.shape
+    nrows, ncols = len(images), len(next(iter(images.values())))
+    return generate_composite_from_stack(composite, nrows, ncols)
+
+
+def generate_composite_from_stack(
+    composite: torch.Tensor, nrows: int, ncols: int
+) -> torch.Tensor:
+    """Same as `generate_composite`, but the images are already stacked in row-major
+    order into a single tensor of shape (nrows * ncols, H, W, C). This allows callers
+    with a fixed layout to precompute the ordering and reuse the stacked buffer."""
+    _, H, W, C = composite.shape
     if H > W:
         h = max(H, 10)
         w = int(W * h / H)
     else:
         w = max(W, 10)
         h = int(H * w / W)
-    composite = resize_with_aspect_fill(composite, h, w)
-    composite = add_border(composite, 1, color=(1, 0, 0))
 
-    # Resize the composite image while maintaining the spatial position
-    _, H, W, C = composite.shape
-    nrows, ncols = len(images), len(next(iter(images.values())))
-    composite = (
-        composite.view(nrows, ncols, H, W, C)
-        .permute(0, 2, 1, 3, 4)
-        .reshape(nrows * H, ncols * W, C)
-    )
+    # Write each image into the inner region of a preallocated grid which is filled
+    # with the border color. This produces the 1 pixel red border around each image
+    # without padding every image separately. Images which need resizing are resized
+    # straight into the grid.
+    shape = (nrows, h + 2, ncols, w + 2, C)
+    grid = torch.empty(shape, dtype=composite.dtype, device=composite.device)
+    grid[:] = torch.tensor((1, 0, 0), dtype=composite.dtype, device=composite.device)
+    inner = grid[:, 1:-1, :, 1:-1].permute(0, 2, 1, 3, 4)
+    if (h, w) != (H, W):
+        resize_with_aspect_fill(composite, h, w, out=inner)
+    else:
+        inner.copy_(composite.reshape(nrows, ncols, h, w, C))
+    return grid.view(nrows * (h + 2), ncols * (w + 2), C)
+
+
+@lru_cache(maxsize=32)
+def _depth_projection_coefs(near: float, far: float) -> Tuple[torch.Tensor, ...]:
+    """Computes the coefficients used by `convert_depth_distances` to undo the OpenGL
+    projection. They only depend on the clipping planes, which are fixed for a model,
+    so they're cached rather than rebuilt on every conversion."""
+
+    # Calculate OpenGL perspective matrix values in float32 precision
+    # so they are close to what glFrustum returns
+    # https://registry.khronos.org/OpenGL-Refpages/gl2.1/xhtml/glFrustum.xml
+    zfar = torch.tensor(far, dtype=torch.float32)
+    znear = torch.tensor(near, dtype=torch.float32)
+    c_coef = -(zfar + znear) / (zfar - znear)
+    d_coef = -(torch.tensor(2.0, dtype=torch.float32) * zfar * znear) / (zfar - znear)
 
-    return composite
+    # In reverse Z mode the perspective matrix is transformed by the following
+    c_coef = torch.tensor(-0.5, dtype=torch.float32) * c_coef - torch.tensor(
+        0.5, dtype=torch.float32
+    )
+    d_coef = torch.tensor(-0.5, dtype=torch.float32) * d_coef
+    return c_coef, d_coef
 
 
 def convert_depth_distances(model: mj.MjModel, depth: torch.Tensor) -> torch.Tensor:
@@ -152,20 +216,7 @@ def convert_depth_distances(model: mj.MjModel, depth: torch.Tensor) -> torch.Ten
     extent = model.stat.extent
     near = model.vis.map.znear * extent
     far = model.vis.map.zfar * extent
-
-    # Calculate OpenGL perspective matrix values in float32 precision
-    # so they are close to what glFrustum returns
-    # https://registry.khronos.org/OpenGL-Refpages/gl2.1/xhtml/glFrustum.xml
-    zfar = torch.tensor(far, dtype=torch.float32)
-    znear = torch.tensor(near, dtype=torch.float32)
-    c_coef = -(zfar + znear) / (zfar - znear)
-    d_coef = -(torch.tensor(2.0, dtype=torch.float32) * zfar * znear) / (zfar - znear)
-
-    # In reverse Z mode the perspective matrix is transformed by the following
-    c_coef = torch.tensor(-0.5, dtype=torch.float32) * c_coef - torch.tensor(
-        0.5, dtype=torch.float32
-    )
-    d_coef = torch.tensor(-0.5, dtype=torch.float32) * d_coef
+    c_coef, d_coef = _depth_projection_coefs(near, far)
 
     # We need 64 bits to convert Z from ndc to metric depth without noticeable
     # losses in precision
@@ -203,6 +254,15 @@ def convert_depth_to_rgb(
     return depth
 
 
+@lru_cache(maxsize=None)
+def _load_default_font(size: int | None = None):
+    """Loads (and caches) the default PIL font. PIL is imported lazily since it's only
+    needed for debug text."""
+    from PIL import ImageFont
+
+    return ImageFont.load_default(size)
+
+
 def add_text(
     image: torch.Tensor,
     text: str,
@@ -225,14 +285,13 @@ def add_text(
     Returns:
         torch.Tensor: The image with the text added.
     """
-    import numpy as np
-    from PIL import Image, ImageDraw, ImageFont
+    from PIL import Image, ImageDraw
 
     device = image.device
 
     image = Image.fromarray((torch.flipud(image) * 255).cpu().numpy().astype("uint8"))
     draw = ImageDraw.Draw(image)
-    font = ImageFont.load_default(size)
+    font = _load_default_font(size)
     draw.text(position, text, font=font, **kwargs)
     image = torch.tensor(np.array(image), device=device) / 255
     image = torch.flipud(image)
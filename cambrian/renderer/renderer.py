@@ -3,6 +3,7 @@
 import atexit
 import ctypes
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from enum import Flag, auto
 from pathlib import Path
@@ -803,8 +804,9 @@ class MjCambrianRenderer:
         )
 
         if self._record and not resetting:
-            rgb_to_record = rgb.clone() if rgb.device == "cpu" else rgb.cpu().clone()
-            self._rgb_buffer.append(rgb_to_record)
+            # Store the recorded frames as uint8 on the cpu. This is 4x smaller than
+            # the float frames and `save` can write them out without converting.
+            self._rgb_buffer.append((rgb * 255.0).to(torch.uint8).cpu())
 
         returns = []
         if self._return_rgb:
@@ -844,36 +846,46 @@ class MjCambrianRenderer:
         get_logger().info(f"Saving visualizations at {path}...")
 
         path = Path(path)
-        rgb_buffer = (
-            (torch.stack(self._rgb_buffer) * 255.0).to(torch.uint8).cpu().numpy()
-        )
-        # Mujoco uses OpenGL, which uses bottom-left origin, so flip the buffer
-        # since most of python uses top-left origin.
-        rgb_buffer = np.flip(rgb_buffer, axis=1)
 
+        # The video formats are written frame by frame, so the recorded frames are
+        # never stacked into a copy. Each format is encoded in its own thread so that
+        # the encoders (ffmpeg, pillow) run concurrently.
+        writers: Dict[Path, "imageio.core.Format.Writer"] = {}
         if save_mode & MjCambrianRendererSaveMode.MP4:
             try:
                 mp4 = path.with_suffix(".mp4")
-                imageio.mimwrite(mp4, rgb_buffer, fps=fps)
+                writers[mp4] = imageio.get_writer(mp4, mode="I", fps=fps)
             except TypeError:
                 get_logger().error(
                     "imageio is not compiled with ffmpeg. "
                     "You may need to install it with `pip install imageio[ffmpeg]`."
                 )
-            get_logger().debug(f"Saved visualization at {mp4}")
-        if save_mode & MjCambrianRendererSaveMode.PNG:
-            png = path.with_suffix(".png")
-            idx = -2 if len(rgb_buffer) > 1 else -1
-            imageio.imwrite(png, rgb_buffer[idx])
-            get_logger().debug(f"Saved visualization at {png}")
         if save_mode & MjCambrianRendererSaveMode.GIF:
             gif = path.with_suffix(".gif")
-            imageio.mimwrite(gif, rgb_buffer, loop=0, duration=duration)
-            get_logger().debug(f"Saved visualization at {gif}")
+            writers[gif] = imageio.get_writer(gif, mode="I", loop=0, duration=duration)
         if save_mode & MjCambrianRendererSaveMode.WEBP:
             webp = path.with_suffix(".webp")
-            imageio.mimwrite(webp, rgb_buffer, fps=fps, lossless=True)
-            get_logger().debug(f"Saved visualization at {webp}")
+            writers[webp] = imageio.get_writer(webp, mode="I", fps=fps, lossless=True)
+
+        def write(writer_path: Path, writer: "imageio.core.Format.Writer"):
+            for rgb in self._rgb_buffer:
+                # Mujoco uses OpenGL, which uses bottom-left origin, so flip the frames
+                # since most of python uses top-left origin.
+                writer.append_data(np.flipud(rgb.numpy()))
+            writer.close()
+            get_logger().debug(f"Saved visualization at {writer_path}")
+
+        if writers:
+            with ThreadPoolExecutor(max_workers=len(writers)) as executor:
+                futures = [executor.submit(write, *item) for item in writers.items()]
+                for future in futures:
+                    future.result()
+
+        if save_mode & MjCambrianRendererSaveMode.PNG:
+            png = path.with_suffix(".png")
+            idx = -2 if len(self._rgb_buffer) > 1 else -1
+            imageio.imwrite(png, np.flipud(self._rgb_buffer[idx].numpy()))
+            get_logger().debug(f"Saved visualization at {png}")
         if save_mode & MjCambrianRendererSaveMode.USD or self._usd_exporter:
             assert self._usd_exporter, "USD exporter not initialized."
             self._usd_exporter.save_scene("usd")
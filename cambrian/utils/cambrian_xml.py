@@ -292,9 +292,13 @@ class MjCambrianXML:
 
         return elements, "/".join(path)
 
-    def combine(self, root: ET.Element, other: ET.Element) -> ET.Element:
-        """Combines two xml trees. Preferred to be called through the `+` or `+=`
-        operators.
+    def combine(self, root: ET.Element, *others: ET.Element) -> ET.Element:
+        """Combines xml trees into `root`. Preferred to be called through the `+` or
+        `+=` operators or `extend`.
+
+        Multiple trees can be passed, in which case they're all merged in a single
+        pass. Nested elements which match the same element in `root` are grouped and
+        merged together, so the mapping for each level is only built once.
 
         Taken from here: https://stackoverflow.com/a/29896847/20125256
         """
@@ -315,29 +319,34 @@ class MjCambrianXML:
         # Create a mapping from tag name to element, as that's what we are filtering
         # with
         mapping = {create_key(el): el for el in root}
-        for el in other:
-            key = create_key(el)
-            if len(el) == 0:
-                # Not nested
-                try:
-                    # Update the text
-                    mapping[key].text = el.text
-                    # Merge attributes
-                    mapping[key].attrib.update(el.attrib)
-                except KeyError:
-                    # An element with this name is not in the mapping
-                    mapping[key] = el
-                    # Add it
-                    root.append(el)
-            else:
-                try:
-                    # Recursively process the element, and update it in the same way
-                    self.combine(mapping[key], el)
-                except KeyError:
+        nested: Dict[Tuple, List[ET.Element]] = {}
+        for other in others:
+            for el in other:
+                key = create_key(el)
+                if len(el) == 0:
+                    # Not nested
+                    try:
+                        # Update the text
+                        mapping[key].text = el.text
+                        # Merge attributes
+                        mapping[key].attrib.update(el.attrib)
+                    except KeyError:
+                        # An element with this name is not in the mapping
+                        mapping[key] = el
+                        # Add it
+                        root.append(el)
+                elif key in mapping:
+                    # Defer processing so all matching elements are merged at once
+                    nested.setdefault(key, []).append(el)
+                else:
                     # Not in the mapping
                     mapping[key] = el
                     # Just add it
                     root.append(el)
+
+        # Recursively process the nested elements, and update them in the same way
+        for key, elements in nested.items():
+            self.combine(mapping[key], *elements)
         return root
 
     @property
@@ -360,6 +369,15 @@ class MjCambrianXML:
         self._tree = ET.ElementTree(self.combine(self._root, other._root))
         return self
 
+    def extend(self, others: List[Self]) -> Self:
+        """Combines multiple xmls into this one. Equivalent to `+=` for each of the
+        xmls, but all of them are merged in a single pass."""
+        assert all(isinstance(other, MjCambrianXML) for other in others)
+        if len(others) > 0:
+            roots = [other._root for other in others]
+            self._tree = ET.ElementTree(self.combine(self._root, *roots))
+        return self
+
     def to_string(self) -> str:
         """This pretty prints the xml to a string. toprettyxml adds a newline at the end
         of the string, so we'll remove any empty lines."""
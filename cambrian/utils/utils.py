@@ -9,6 +9,7 @@ from typing import (
     Callable,
     Dict,
     Generator,
+    Iterable,
     List,
     Optional,
     Tuple,
@@ -116,7 +117,7 @@ def save_data(data: Any, outdir: Path, pickle_file: Path):
     pickle_file = (outdir / pickle_file).resolve()
     pickle_file.parent.mkdir(parents=True, exist_ok=True)
     with open(pickle_file, "wb") as f:
-        pickle.dump(data, f)
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
     get_logger().info(f"Saved parsed data to {pickle_file}.")
 
 
@@ -364,3 +365,14 @@ register_pickle_unpickleable_object(mj.MjvCamera)
 def agent_selected(agent: "MjCambrianAgent", agents: Optional[List[str]]):
     """Check if the agent is selected."""
     return agents is None or any(fnmatch(agent.name, pattern) for pattern in agents)
+
+
+def agents_selected_mask(
+    names: Iterable[str], agents: Optional[List[str]]
+) -> np.ndarray:
+    """Returns a boolean mask over `names` (in order) of which agents are selected.
+    Equivalent to calling `agent_selected` for each agent."""
+    return np.array(
+        [agents is None or any(fnmatch(n, p) for p in agents) for n in names],
+        dtype=bool,
+    )
@@ -237,6 +237,16 @@ class MjCambrianConstantActionWrapper(gym.Wrapper):
         ]
         self._constant_action_values = list(constant_actions.values())
 
+        # Precompute the index/value arrays used to set array actions so they don't
+        # have to be converted on every step
+        self._constant_action_index_array: np.ndarray | None = None
+        self._constant_action_value_array: np.ndarray | None = None
+        if all(isinstance(idx, int) for idx in self._constant_action_indices):
+            self._constant_action_index_array = np.array(
+                self._constant_action_indices, dtype=int
+            )
+            self._constant_action_value_array = np.array(self._constant_action_values)
+
     def step(
         self, action: ActionType
     ) -> Tuple[ObsType, RewardType, TerminatedType, TruncatedType, InfoType]:
@@ -245,7 +255,16 @@ class MjCambrianConstantActionWrapper(gym.Wrapper):
                 "The constant action indices must be in the action space."
                 f"Indices: {self._constant_action_indices}, Action space: {action}"
             )
-        action[self._constant_action_indices] = self._constant_action_values
+            for idx, value in zip(
+                self._constant_action_indices, self._constant_action_values
+            ):
+                action[idx] = value
+        elif self._constant_action_index_array is not None:
+            action[self._constant_action_index_array] = (
+                self._constant_action_value_array
+            )
+        else:
+            action[self._constant_action_indices] = self._constant_action_values
 
         return self.env.step(action)
 
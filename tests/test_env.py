@@ -0,0 +1,55 @@
+"""Tests for the MjCambrianEnv."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("mujoco")
+pytest.importorskip("hydra_config")
+env_module = pytest.importorskip("cambrian.envs.env")
+
+
+def _make_env(step_fn, xpos: np.ndarray) -> "env_module.MjCambrianEnv":
+    """Creates an env with only the state used by the step fn bookkeeping, so the
+    test doesn't need to compile a model."""
+    env = env_module.MjCambrianEnv.__new__(env_module.MjCambrianEnv)
+    env._spec = SimpleNamespace(data=SimpleNamespace(xpos=xpos))
+    env._agent_body_ids = np.array([1, 2], dtype=int)
+    env._agent_positions = xpos[env._agent_body_ids].copy()
+    env._step_fn = step_fn
+    env._skip_step_fn = False
+    return env
+
+
+def test_agent_positions_refreshed_after_respawn_in_step_fn():
+    """The step fn applied at the end of reset (and step) may respawn agents. The
+    agent positions must reflect the respawned position afterwards."""
+    xpos = np.zeros((3, 3))
+    xpos[1] = [1.0, 1.0, 0.0]
+    xpos[2] = [1.0, 1.5, 0.0]
+    respawn_pos = np.array([5.0, -5.0, 0.0])
+
+    def step_respawn(env, obs, info):
+        # Move the second agent, like `step_respawn_agents_if_close_to_agents`
+        env._spec.data.xpos[2] = respawn_pos
+        info["agent_1"]["respawned"] = True
+        return obs, info
+
+    env = _make_env(step_respawn, xpos)
+    obs, info = env._apply_step_fn({}, {"agent_1": {}})
+
+    assert info["agent_1"]["respawned"]
+    np.testing.assert_array_equal(env.agent_positions[0], xpos[1])
+    np.testing.assert_array_equal(env.agent_positions[1], respawn_pos)
+
+
+def test_agent_positions_refreshed_without_step_fn():
+    xpos = np.arange(9, dtype=np.float64).reshape(3, 3)
+    env = _make_env(None, xpos)
+    env._skip_step_fn = True
+
+    xpos[1] = [-1.0, -2.0, -3.0]
+    env._apply_step_fn({}, {})
+
+    np.testing.assert_array_equal(env.agent_positions, xpos[[1, 2]])